@@ -0,0 +1,27 @@
+import uuid
+
+from django.core.cache import cache
+
+def get_version_key(name):
+    return 'version-{name}'.format(name=name)
+
+def get_version(name):
+    key = get_version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+def update_version(name):
+    cache.set(get_version_key(name), uuid.uuid4().hex, None)
+
+local_values = {}
+
+def get_local_value(key, version_name, build):
+    version = get_version(version_name)
+    cached_version, value = local_values.get(key, (None, None))
+    if cached_version != version:
+        value = build()
+        local_values[key] = (version, value)
+    return value
@@ -0,0 +1,5 @@
+from django.db.models import Max
+
+def get_next_order(queryset, step=10):
+    max_order = queryset.aggregate(max_order=Max('order'))['max_order']
+    return (max_order or 0) + step
@@ -1,3 +1,4 @@
+from django.core.exceptions import ImproperlyConfigured
 import environ
 import os
 
@@ -23,14 +24,14 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'admin_ordering',
     'ckeditor',
-    'tags',
-    'resources',
-    'patients',
+    'tags.apps.TagsConfig',
+    'resources.apps.ResourcesConfig',
+    'patients.apps.PatientsConfig',
     'faqs',
-    'study_sessions',
+    'study_sessions.apps.StudySessionsConfig',
     'highlights',
-    'website',
-    'content_map'
+    'website.apps.WebsiteConfig',
+    'content_map.apps.ContentMapConfig'
 ]
 
 MIDDLEWARE = [
@@ -86,6 +87,32 @@ else:
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+# Cached pages, fragments and process memos are invalidated through
+# version keys stored in this cache, so every process (web workers and
+# management commands) must share it. Production should point CACHE_URL
+# at memcached. A local memory cache is only allowed while debugging;
+# otherwise the database cache table created by `manage.py
+# createcachetable` is the fallback. Django's default limit of 300
+# entries is far below the page and fragment working set, so both
+# fallbacks are sized with CACHE_MAX_ENTRIES and cull a tenth of their
+# entries when full.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://' if DEBUG else 'dbcache://django_cache')
+}
+if not DEBUG and CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+    raise ImproperlyConfigured('CACHE_URL must point to a cache shared between processes when DEBUG is off')
+if CACHES['default']['BACKEND'] in [
+    'django.core.cache.backends.db.DatabaseCache',
+    'django.core.cache.backends.locmem.LocMemCache'
+]:
+    cache_options = CACHES['default'].setdefault('OPTIONS', {})
+    cache_options.setdefault('MAX_ENTRIES', env.int('CACHE_MAX_ENTRIES', default=50000))
+    cache_options.setdefault('CULL_FREQUENCY', 10)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -14,9 +14,11 @@ from django.forms import CharField
 from django.forms import EmailField
 from django.urls import path
 
+from content_map.views import ContentMapExportView
 from content_map.views import ContentMapView
 from highlights.views import HighlightsView
 from highlights.views import HighlightDetailsView
+from resources.views import ResourcePopoversView
 from website.views import PatientStoryView
 from website.views import HomePageView
 from website.views import PatientStoryListView
@@ -25,6 +27,7 @@ from website.views import ResourceArticleView
 from website.views import FrequentlyAskedQuestionListView
 from website.views import FrequentlyAskedQuestionView
 from website.views import RelatedContentView
+from website.views import ContentCatalogView
 from website.views import MyCFStageSurveyView
 from website.views import ReorderRelatedContent
 from website.views import StudySessionView
@@ -72,6 +75,8 @@ urlpatterns = [
     path('admin/login/', login_view),
     path('admin/logout/', logout_view),
     path('admin/', admin.site.urls),
+    path('content-map/<content_id>.json', ContentMapExportView.as_view(), {'export_format': 'json'}, name='content-map-json'),
+    path('content-map/<content_id>.csv', ContentMapExportView.as_view(), {'export_format': 'csv'}, name='content-map-csv'),
     path('content-map/<content_id>', ContentMapView.as_view(), name='content-map'),
     path('content-map', ContentMapView.as_view(), name='content-map'),
     path('login/', login_view, name='login'),
@@ -82,10 +87,12 @@ urlpatterns = [
     path('reset-password/', PasswordResetView.as_view(), name='password_reset'),
     path('highlights/<highlight_id>', HighlightDetailsView.as_view(), name='highlight'),
     path('highlights', HighlightsView.as_view(), name='highlight-list'),
+    path('related-content/catalog.json', ContentCatalogView.as_view(), name='content-catalog'),
     path('related-content/<content_type>/<content_id>/reorder', ReorderRelatedContent.as_view(), name='reorder-related-content'),
     path('related-content/<content_type>/<content_id>', RelatedContentView.as_view(), name='related-content'),
     path('questions/<question_id>', FrequentlyAskedQuestionView.as_view(), name='question'),
     path('questions', FrequentlyAskedQuestionListView.as_view(), name='question-list'),
+    path('resources/popovers.json', ResourcePopoversView.as_view(), name='resource-popovers'),
     path('resources/<article_id>', ResourceArticleView.as_view(), name='resource-article'),
     path('resources', ResourceLibraryView.as_view(), name='resource-list'),
     path('stories/<patient_id>/', PatientStoryView.as_view(), name='patient-story'),
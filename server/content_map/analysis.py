@@ -0,0 +1,84 @@
+from collections import OrderedDict
+import hashlib
+
+from bs4 import BeautifulSoup
+import readability
+import syntok.segmenter as segmenter
+from syntok.tokenizer import Tokenizer
+
+STATISTICS = ['words', 'sentences', 'paragraphs', 'syllables', 'complex_words', 'characters']
+BREAKS = ['starts_with_break', 'ends_with_break']
+PARAGRAPH_MEMO_SIZE = 4096
+
+class ParagraphMemo:
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.values = OrderedDict()
+
+    def get_key(self, paragraph):
+        return hashlib.sha1(paragraph.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        found = {}
+        for key in keys:
+            if key in self.values:
+                self.values.move_to_end(key)
+                found[key] = self.values[key]
+        return found
+
+    def set_many(self, values):
+        for key, value in values.items():
+            self.values[key] = value
+            self.values.move_to_end(key)
+        while len(self.values) > self.max_size:
+            self.values.popitem(last=False)
+
+paragraph_memo = ParagraphMemo(PARAGRAPH_MEMO_SIZE)
+
+def tokenize_paragraph(paragraph):
+    tokens = Tokenizer(replace_not_contraction=False).tokenize(paragraph)
+    sentences = []
+    for sentence in segmenter.segment(tokens):
+        sentences.append(' '.join([token.value for token in sentence]))
+    return '\n'.join(sentences)
+
+def tokenize_text(text):
+    paragraphs = [paragraph for offset, paragraph in segmenter.preprocess_with_offsets(text)]
+    keys = [paragraph_memo.get_key(paragraph) for paragraph in paragraphs]
+    tokenized = paragraph_memo.get_many(keys)
+    missing = {}
+    for key, paragraph in zip(keys, paragraphs):
+        if key not in tokenized and key not in missing:
+            missing[key] = tokenize_paragraph(paragraph)
+    paragraph_memo.set_many(missing)
+    tokenized.update(missing)
+    return '\n\n'.join([tokenized[key] for key in keys])
+
+def count_statistics(tokenized, lang='en'):
+    count_syllables = readability.LANGDATA[lang]['syllables']
+    statistics = {name: 0 for name in STATISTICS}
+    statistics['starts_with_break'] = tokenized.startswith('\n\n')
+    statistics['ends_with_break'] = tokenized.endswith('\n\n')
+    if not tokenized:
+        return statistics
+    statistics['paragraphs'] = sum(1 for _ in readability.PARARE.finditer(tokenized)) + 1
+    statistics['sentences'] = sum(1 for _ in readability.SENTRE.finditer(tokenized))
+    for token in readability.WORDRE.findall(tokenized):
+        statistics['words'] += 1
+        statistics['characters'] += len(token)
+        syllables = count_syllables(token)
+        statistics['syllables'] += syllables
+        if syllables >= 3 and not token[0].isupper():
+            statistics['complex_words'] += 1
+    return statistics
+
+def analyze_text(text):
+    return count_statistics(tokenize_text(text))
+
+def get_html_text(html):
+    soup = BeautifulSoup(html or '', 'html.parser')
+    return '\n\n'.join([p.text for p in soup.find_all('p')])
+
+def analyze_html(html):
+    return analyze_text(get_html_text(html))
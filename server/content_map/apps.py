@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ContentMapConfig(AppConfig):
     name = 'content_map'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
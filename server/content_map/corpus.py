@@ -0,0 +1,91 @@
+import numpy
+
+from .analysis import BREAKS
+from .analysis import STATISTICS
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+class ReadabilityCorpus:
+
+    def __init__(self, documents):
+        self.size = len(documents)
+        leaves = []
+        document_ids = []
+        for document_id, statistics_list in enumerate(documents):
+            for statistics in statistics_list:
+                if statistics['paragraphs']:
+                    leaves.append(statistics)
+                    document_ids.append(document_id)
+        self.document_ids = numpy.array(document_ids, dtype=numpy.intp)
+        self.leaves = {}
+        for name in STATISTICS + BREAKS:
+            self.leaves[name] = numpy.array([statistics[name] for statistics in leaves], dtype=numpy.float64)
+        self.counts = {}
+        for name in STATISTICS:
+            self.counts[name] = self.sum_by_document(self.document_ids, self.leaves[name])
+        self.counts['paragraphs'] -= self.get_merged_paragraphs()
+        self.analyzed = self.counts['words'] > 0
+        self.scores = self.get_scores()
+        self.grade_level_percentiles = self.get_percentile_ranks('grade_level')
+
+    def sum_by_document(self, document_ids, values):
+        return numpy.bincount(document_ids, weights=values, minlength=self.size)
+
+    def get_merged_paragraphs(self):
+        same_document = self.document_ids[1:] == self.document_ids[:-1]
+        merged = self.leaves['ends_with_break'][:-1] + self.leaves['starts_with_break'][1:]
+        return self.sum_by_document(self.document_ids[1:], merged * same_document)
+
+    def get_scores(self):
+        words = self.counts['words']
+        sentences = self.counts['sentences']
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            syllables_per_word = self.counts['syllables'] / words
+            words_per_sentence = words / sentences
+            scores = {
+                'grade_level': 11.8 * syllables_per_word + 0.39 * words_per_sentence - 15.59,
+                'flesch_reading_ease': 206.835 - 84.6 * syllables_per_word - 1.015 * words_per_sentence,
+                'gunning_fog': 0.4 * (words_per_sentence + (100 * (self.counts['complex_words'] / words))),
+                'words_per_sentence': words_per_sentence,
+                'sentences_per_paragraph': sentences / self.counts['paragraphs']
+            }
+        for name in scores:
+            scores[name] = numpy.where(self.analyzed, scores[name], numpy.nan)
+        return scores
+
+    def get_percentile_ranks(self, name):
+        values = self.scores[name]
+        analyzed_values = numpy.sort(values[self.analyzed])
+        if not len(analyzed_values):
+            return numpy.full(self.size, numpy.nan)
+        ranks = numpy.searchsorted(analyzed_values, values, side='right') * 100 / len(analyzed_values)
+        return numpy.where(self.analyzed, ranks, numpy.nan)
+
+    def get_distribution(self, name, percentiles=PERCENTILES):
+        values = self.scores[name][self.analyzed]
+        if not len(values):
+            return []
+        return [float(value) for value in numpy.percentile(values, percentiles)]
+
+    def serialize(self, index):
+        if not self.analyzed[index]:
+            return {
+                'grade_level': None,
+                'grade_level_percentile': None,
+                'flesch_reading_ease': None,
+                'gunning_fog': None,
+                'words': 0,
+                'words_per_sentence': 0,
+                'sentences_per_paragraph': 0,
+                'paragraphs': 0
+            }
+        return {
+            'grade_level': float(self.scores['grade_level'][index]),
+            'grade_level_percentile': float(self.grade_level_percentiles[index]),
+            'flesch_reading_ease': float(self.scores['flesch_reading_ease'][index]),
+            'gunning_fog': float(self.scores['gunning_fog'][index]),
+            'words': int(self.counts['words'][index]),
+            'words_per_sentence': float(self.scores['words_per_sentence'][index]),
+            'sentences_per_paragraph': float(self.scores['sentences_per_paragraph'][index]),
+            'paragraphs': int(self.counts['paragraphs'][index])
+        }
@@ -0,0 +1,52 @@
+from faqs.models import Answer
+from faqs.models import FrequentlyAskedQuestion
+from patients.models import Patient
+from patients.models import PatientStory
+from resources.models import Article
+from website.loaders import group_by
+from website.loaders import load_articles
+
+from .models import ReadabilityMetrics
+
+def load_content_leaves(content_list):
+    patient_ids = set([content.id for content in content_list if isinstance(content, Patient)])
+    stories_by_patient = group_by(PatientStory.objects.filter(
+        patient_id__in = patient_ids,
+        published = True
+    ).all(), 'patient_id')
+    question_ids = set([content.id for content in content_list if isinstance(content, FrequentlyAskedQuestion)])
+    answers_by_question = group_by(Answer.objects.filter(
+        question_id__in = question_ids,
+        published = True
+    ).order_by('order').all(), 'question_id')
+    load_articles([content for content in content_list if isinstance(content, Article)])
+    leaves = []
+    for content in content_list:
+        if isinstance(content, Patient):
+            leaves.append([(story, story.content) for story in stories_by_patient.get(content.id, [])])
+        elif isinstance(content, FrequentlyAskedQuestion):
+            leaves.append([(answer, answer.text) for answer in answers_by_question.get(content.id, [])])
+        elif isinstance(content, Article):
+            leaves.append([(article, article.content) for article in [content] + content.children])
+        elif isinstance(content, Answer):
+            leaves.append([(content, content.text)])
+        else:
+            leaves.append(None)
+    return leaves
+
+def load_content_statistics(content_list):
+    leaves = load_content_leaves(content_list)
+    all_leaves = []
+    for content_leaves in leaves:
+        all_leaves += content_leaves or []
+    metrics = ReadabilityMetrics.objects.get_or_analyze(all_leaves)
+    statistics_by_leaf = {}
+    for (leaf, html), _metrics in zip(all_leaves, metrics):
+        statistics_by_leaf[(type(leaf), leaf.id)] = _metrics.statistics
+    statistics = []
+    for content_leaves in leaves:
+        if content_leaves is None:
+            statistics.append(None)
+        else:
+            statistics.append([statistics_by_leaf[(type(leaf), leaf.id)] for leaf, html in content_leaves])
+    return statistics
@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import math
+import os
+import time
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+import readability
+import syntok.segmenter as segmenter
+
+from faqs.models import Answer
+from faqs.models import FrequentlyAskedQuestion
+from patients.models import Patient
+from patients.models import PatientStory
+from resources.html import get_content_hash
+from resources.models import Article
+
+from content_map.analysis import analyze_html
+from content_map.analysis import get_html_text
+from content_map.corpus import ReadabilityCorpus
+from content_map.loaders import load_content_leaves
+from content_map.loaders import load_content_statistics
+from content_map.models import ReadabilityMetrics
+
+ANALYZED_FIELDS = [
+    (PatientStory, 'content'),
+    (Answer, 'text'),
+    (Article, 'content')
+]
+
+VALIDATED_MEASURES = [
+    ('grade_level', 'readability grades', 'Kincaid'),
+    ('flesch_reading_ease', 'readability grades', 'FleschReadingEase'),
+    ('gunning_fog', 'readability grades', 'GunningFogIndex'),
+    ('words', 'sentence info', 'words'),
+    ('words_per_sentence', 'sentence info', 'words_per_sentence'),
+    ('sentences_per_paragraph', 'sentence info', 'sentences_per_paragraph'),
+    ('paragraphs', 'sentence info', 'paragraphs')
+]
+
+class Command(BaseCommand):
+    help = 'Computes stored readability metrics for published stories, answers and articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action = 'store_true',
+            help = 'Recompute metrics even when the content has not changed'
+        )
+        parser.add_argument(
+            '--workers',
+            type = int,
+            default = os.cpu_count(),
+            help = 'Number of worker processes (defaults to the number of CPUs)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type = int,
+            default = 200,
+            help = 'Number of items analyzed and written per batch'
+        )
+        parser.add_argument(
+            '--validate',
+            action = 'store_true',
+            help = 'Compare corpus scores with readability.getmeasures on the full text of each item'
+        )
+
+    def get_stored_keys(self, content_type_ids):
+        return set(ReadabilityMetrics.objects.filter(
+            content_type_id__in = content_type_ids
+        ).values_list('content_type_id', 'object_id', 'content_hash'))
+
+    def iterate_contents(self):
+        for model, field in ANALYZED_FIELDS:
+            content_type = ContentType.objects.get_for_model(model)
+            contents = model.objects.filter(
+                published = True
+            ) \
+            .values_list('id', field) \
+            .iterator()
+            for object_id, html in contents:
+                yield content_type.id, object_id, html or ''
+
+    def iterate_changed_contents(self, force):
+        content_type_ids = [ContentType.objects.get_for_model(model).id for model, field in ANALYZED_FIELDS]
+        stored_keys = set() if force else self.get_stored_keys(content_type_ids)
+        self.unchanged = 0
+        for content_type_id, object_id, html in self.iterate_contents():
+            key = (content_type_id, object_id, get_content_hash(html))
+            if key in stored_keys:
+                self.unchanged += 1
+            else:
+                yield key, html
+
+    def write_metrics(self, keys, analyses):
+        with transaction.atomic():
+            for content_type_id in set([key[0] for key in keys]):
+                ReadabilityMetrics.objects.filter(
+                    content_type_id = content_type_id,
+                    object_id__in = [key[1] for key in keys if key[0] == content_type_id]
+                ).delete()
+            ReadabilityMetrics.objects.bulk_create([
+                ReadabilityMetrics.from_analysis(key, analysis) for key, analysis in zip(keys, analyses)
+            ])
+
+    def get_validated_content(self):
+        content_list = list(Patient.objects.filter(published=True).order_by('id'))
+        content_list += list(FrequentlyAskedQuestion.objects.filter(published=True).order_by('id'))
+        content_list += list(Article.objects.filter(published=True, parent=None).order_by('id'))
+        content_list += list(Answer.objects.filter(published=True).order_by('id'))
+        return content_list
+
+    def get_reference_measures(self, html):
+        paragraphs = []
+        for paragraph in segmenter.analyze(get_html_text(html)):
+            sentences = []
+            for sentence in paragraph:
+                sentences.append(' '.join([token.value for token in sentence]))
+            paragraphs.append('\n'.join(sentences))
+        return readability.getmeasures('\n\n'.join(paragraphs), lang='en')
+
+    def validate(self):
+        content_list = self.get_validated_content()
+        corpus = ReadabilityCorpus([
+            statistics_list or [] for statistics_list in load_content_statistics(content_list)
+        ])
+        leaves = load_content_leaves(content_list)
+        mismatches = 0
+        for index, (content, content_leaves) in enumerate(zip(content_list, leaves)):
+            serialized = corpus.serialize(index)
+            if serialized['grade_level'] is None:
+                continue
+            measures = self.get_reference_measures(''.join([html or '' for leaf, html in content_leaves]))
+            for name, group, measure in VALIDATED_MEASURES:
+                if not math.isclose(serialized[name], measures[group][measure], rel_tol=1e-9):
+                    mismatches += 1
+                    self.stderr.write('%s %d: %s is %s, expected %s' % (
+                        type(content).__name__,
+                        content.id,
+                        name,
+                        serialized[name],
+                        measures[group][measure]
+                    ))
+        if mismatches:
+            raise CommandError('%d readability measures differ from readability.getmeasures' % mismatches)
+        self.stdout.write(self.style.SUCCESS(
+            'Validated %d items against readability.getmeasures' % corpus.analyzed.sum()
+        ))
+
+    def handle(self, *args, **options):
+        start = time.time()
+        changed = self.iterate_changed_contents(options['force'])
+        workers = max(1, options['workers'] or 1)
+        batch_size = max(1, options['batch_size'])
+        analyzed = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                batch = list(islice(changed, batch_size))
+                if not batch:
+                    break
+                chunksize = max(1, len(batch) // (workers * 4))
+                analyses = list(executor.map(analyze_html, [html for key, html in batch], chunksize=chunksize))
+                self.write_metrics([key for key, html in batch], analyses)
+                analyzed += len(batch)
+        elapsed = time.time() - start
+        self.stdout.write(self.style.SUCCESS(
+            'Analyzed %d items (%d unchanged) in %.2fs with %d workers, %.1f items per second' % (
+                analyzed,
+                self.unchanged,
+                elapsed,
+                workers,
+                analyzed / elapsed if elapsed else 0
+            )
+        ))
+        if options['validate']:
+            self.validate()
@@ -0,0 +1,34 @@
+# Generated by Django 3.1.1 on 2026-10-18 15:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadabilityMetrics',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('content_hash', models.CharField(max_length=40)),
+                ('grade_level', models.FloatField(blank=True, null=True)),
+                ('words', models.PositiveIntegerField(default=0)),
+                ('words_per_sentence', models.FloatField(default=0)),
+                ('sentences_per_paragraph', models.FloatField(default=0)),
+                ('paragraphs', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'unique_together': {('content_type', 'object_id', 'content_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.1.1 on 2026-10-18 15:12
+
+from django.db import migrations, models
+
+
+def clear_metrics(apps, schema_editor):
+    ReadabilityMetrics = apps.get_model('content_map', 'ReadabilityMetrics')
+    ReadabilityMetrics.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_map', '0001_readability_metrics'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_metrics, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='readabilitymetrics',
+            name='grade_level',
+        ),
+        migrations.RemoveField(
+            model_name='readabilitymetrics',
+            name='sentences_per_paragraph',
+        ),
+        migrations.RemoveField(
+            model_name='readabilitymetrics',
+            name='words_per_sentence',
+        ),
+        migrations.AddField(
+            model_name='readabilitymetrics',
+            name='characters',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='readabilitymetrics',
+            name='ends_with_break',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='readabilitymetrics',
+            name='sentences',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='readabilitymetrics',
+            name='starts_with_break',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='readabilitymetrics',
+            name='syllables',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.1.1 on 2026-10-18 15:17
+
+from django.db import migrations, models
+
+
+def clear_metrics(apps, schema_editor):
+    ReadabilityMetrics = apps.get_model('content_map', 'ReadabilityMetrics')
+    ReadabilityMetrics.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_map', '0002_readability_statistics'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_metrics, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='readabilitymetrics',
+            name='complex_words',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,3 +1,96 @@
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
-# Create your models here.
+from resources.html import get_content_hash
+
+from .analysis import BREAKS
+from .analysis import STATISTICS
+from .analysis import analyze_html
+
+class ReadabilityMetricsManager(models.Manager):
+
+    def get_keys(self, content_object, html):
+        content_type = ContentType.objects.get_for_model(content_object)
+        return (content_type.id, content_object.id, get_content_hash(html))
+
+    def get_stored(self, keys):
+        keys = set(keys)
+        if not keys:
+            return {}
+        stored = self.filter(
+            content_type_id__in = set([key[0] for key in keys]),
+            object_id__in = set([key[1] for key in keys]),
+            content_hash__in = set([key[2] for key in keys])
+        ).all()
+        metrics_by_key = {}
+        for metrics in stored:
+            if metrics.key in keys:
+                metrics_by_key[metrics.key] = metrics
+        return metrics_by_key
+
+    def get_or_analyze(self, contents):
+        keys_by_content = []
+        for content_object, html in contents:
+            keys_by_content.append((self.get_keys(content_object, html), html))
+        metrics_by_key = self.get_stored([key for key, html in keys_by_content])
+        missing = []
+        for key, html in keys_by_content:
+            if key not in metrics_by_key:
+                metrics_by_key[key] = self.model.from_analysis(key, analyze_html(html))
+                missing.append(metrics_by_key[key])
+        if missing:
+            self.bulk_create(missing, ignore_conflicts=True)
+        return [metrics_by_key[key] for key, html in keys_by_content]
+
+    def update_for(self, content_object, html):
+        key = self.get_keys(content_object, html)
+        content_type_id, object_id, content_hash = key
+        self.filter(
+            content_type_id = content_type_id,
+            object_id = object_id
+        ) \
+        .exclude(content_hash = content_hash) \
+        .delete()
+        if not self.filter(content_type_id=content_type_id, object_id=object_id, content_hash=content_hash).exists():
+            self.bulk_create([self.model.from_analysis(key, analyze_html(html))], ignore_conflicts=True)
+
+class ReadabilityMetrics(models.Model):
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    content_hash = models.CharField(max_length=40)
+
+    words = models.PositiveIntegerField(default=0)
+    sentences = models.PositiveIntegerField(default=0)
+    paragraphs = models.PositiveIntegerField(default=0)
+    syllables = models.PositiveIntegerField(default=0)
+    complex_words = models.PositiveIntegerField(default=0)
+    characters = models.PositiveIntegerField(default=0)
+    starts_with_break = models.BooleanField(default=False)
+    ends_with_break = models.BooleanField(default=False)
+
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = ReadabilityMetricsManager()
+
+    class Meta:
+        unique_together = [('content_type', 'object_id', 'content_hash')]
+
+    @classmethod
+    def from_analysis(cls, key, analysis):
+        content_type_id, object_id, content_hash = key
+        return cls(
+            content_type_id = content_type_id,
+            object_id = object_id,
+            content_hash = content_hash,
+            **analysis
+        )
+
+    @property
+    def key(self):
+        return (self.content_type_id, self.object_id, self.content_hash)
+
+    @property
+    def statistics(self):
+        return {name: getattr(self, name) for name in STATISTICS + BREAKS}
@@ -0,0 +1,30 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+
+from faqs.models import Answer
+from patients.models import PatientStory
+from resources.models import Article
+
+from .models import ReadabilityMetrics
+
+def get_analyzed_html(instance):
+    if isinstance(instance, Answer):
+        return instance.text
+    return instance.content
+
+def update_readability_metrics(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    ReadabilityMetrics.objects.update_for(instance, get_analyzed_html(instance))
+
+def delete_readability_metrics(sender, instance, **kwargs):
+    ReadabilityMetrics.objects.filter(
+        content_type = ContentType.objects.get_for_model(instance),
+        object_id = instance.id
+    ).delete()
+
+def connect_signals():
+    for model in [Answer, Article, PatientStory]:
+        post_save.connect(update_readability_metrics, sender=model)
+        post_delete.connect(delete_readability_metrics, sender=model)
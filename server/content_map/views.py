@@ -1,94 +1,121 @@
-from bs4 import BeautifulSoup
+import csv
+from itertools import chain
+from itertools import islice
+import json
+
+from django.contrib.contenttypes.models import ContentType
 from django.http import Http404
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from django.urls import reverse
 from django.views.generic.base import TemplateView
-import readability
-import syntok.segmenter as segmenter
 
 from website.views import BaseWebsiteView
+from website.models import RelatedItem
 from website.models import RelatedItemsList
 
-from faqs.models import Answer
 from faqs.models import FrequentlyAskedQuestion
-from faqs.models import Category as FAQCategory
+from faqs.models import QuestionInCategory
 from resources.models import Article
 from patients.models import Patient
 from patients.models import PatientStory
 
+from .corpus import PERCENTILES
+from .corpus import ReadabilityCorpus
+from .loaders import load_content_statistics
+
+DISTRIBUTION_SCORES = [
+    ('grade_level', 'Grade Level'),
+    ('flesch_reading_ease', 'Flesch Reading Ease'),
+    ('gunning_fog', 'Gunning Fog Index'),
+    ('words_per_sentence', 'Words per Sentence')
+]
+
+EXPORTED_READABILITY_FIELDS = [
+    'grade_level',
+    'flesch_reading_ease',
+    'gunning_fog',
+    'words',
+    'words_per_sentence',
+    'sentences_per_paragraph',
+    'paragraphs'
+]
+
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+class StreamBuffer:
+
+    def write(self, value):
+        return value
+
 class ContentMapView(BaseWebsiteView):
 
     content_list = []
     template_name = 'content-map.html'
 
-    def get_patients(self):
-        patients = Patient.objects.filter(
+    def get_patient_queryset(self):
+        return Patient.objects.filter(
             published = True
         ).order_by('name')
-        return list(patients)
 
-    def analyze_frequently_asked_question(self, question):
-        return self.analyze_html(''.join([response.text for response in question.responses]))
+    def get_patients(self):
+        return list(self.get_patient_queryset())
 
-    def analyze_faq_response(self, response):
-        return self.analyze_html(response.text)
+    def analyze_content_list(self, content_list):
+        statistics = load_content_statistics(content_list)
+        corpus = ReadabilityCorpus([statistics_list or [] for statistics_list in statistics])
+        analysis = []
+        for index, statistics_list in enumerate(statistics):
+            if statistics_list is None:
+                analysis.append({
+                    'type': 'unknown',
+                    'title': 'Unknown Content'
+                })
+            else:
+                analysis.append(corpus.serialize(index))
+        return analysis, corpus
 
-    def analyze_patient_story(self, patient_story):
+    def serialize_readability_distribution(self, corpus):
+        scores = []
+        for name, title in DISTRIBUTION_SCORES:
+            values = corpus.get_distribution(name)
+            if values:
+                scores.append({
+                    'title': title,
+                    'values': values
+                })
         return {
-            'type': 'patient-story',
-            'title': patient_story.title,
-            'readability': self.analyze_html(patient_story.content),
-            'content': patient_story.content
+            'percentiles': PERCENTILES,
+            'scores': scores
         }
 
-    def analyze_patient(self, patient):
-        full_content = [story.content for story in patient.stories]
-        return self.analyze_html(''.join(full_content))
-
-    def analyze_resource_article_content(self, article):
-        return self.analyze_html(article.content)
-
-    def analyze_resource_article(self, article):
-        full_content = [article.content] + [child.content for child in article.children]
-        return self.analyze_html(''.join(full_content))
-
-    def tokenize_text(self, text):
-        paragraphs = []
-        for paragraph in segmenter.analyze(text):
-            sentences = []
-            for sentence in paragraph:
-                sentences.append(' '.join([token.value for token in sentence]))
-            paragraphs.append('\n'.join(sentences))
-        return '\n\n'.join(paragraphs)
-
-    def analyze_text(self, text):
-        tokenized = self.tokenize_text(text)
-        measures = readability.getmeasures(tokenized, lang='en')
-        return {
-            'grade_level': measures['readability grades']['Kincaid'],
-            'words': measures['sentence info']['words'],
-            'words_per_sentence': measures['sentence info']['words_per_sentence'],
-            'sentences_per_paragraph': measures['sentence info']['sentences_per_paragraph'],
-            'paragraphs': measures['sentence info']['paragraphs']
-        }
-    
-    def analyze_html(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        return self.analyze_text('\n\n'.join([p.text for p in soup.find_all('p')]))
-
-    def get_resource_articles(self):
-        articles = Article.objects.filter(
+    def get_resource_article_queryset(self):
+        return Article.objects.filter(
             published = True,
             parent = None
         ).all()
-        return list(articles)
 
+    def get_resource_articles(self):
+        return list(self.get_resource_article_queryset())
+
+    def get_question_queryset(self):
+        return QuestionInCategory.objects.filter(
+            category__published = True
+        ) \
+        .select_related('question') \
+        .order_by('category__order', 'category_id', 'order')
 
     def get_frequently_asked_questions(self):
-        questions = []
-        for category in FAQCategory.objects.filter(published=True).all():
-            questions += category.questions
-        return questions
+        return [question_in_category.question for question_in_category in self.get_question_queryset()]
+
+    def get_content_queryset(self, content_id):
+        if content_id == 'stories':
+            return self.get_patient_queryset()
+        if content_id == 'resources':
+            return self.get_resource_article_queryset()
+        if content_id == 'questions':
+            return self.get_question_queryset()
+        return None
 
     def get_content_list(self, content_id):
         if content_id == 'stories':
@@ -111,20 +138,6 @@ class ContentMapView(BaseWebsiteView):
         except RelatedItemsList.DoesNotExist:
             return []
 
-    def analyze_content(self, content):
-        if isinstance(content, Article):
-            return self.analyze_resource_article(content)
-        if isinstance(content, Patient):
-            return self.analyze_patient(content)
-        if isinstance(content, FrequentlyAskedQuestion):
-            return self.analyze_frequently_asked_question(content)
-        if isinstance(content, Answer):
-            return self.analyze_faq_response(content)
-        return {
-            'type': 'unknown',
-            'title': 'Unknown Content'
-        }
-
     def serialize_related_content(self, content):
         serialized = []
         for _content in self.get_related_content(content):
@@ -135,15 +148,15 @@ class ContentMapView(BaseWebsiteView):
             })
         return serialized
 
-    def serialize_content_list(self, content_list):
+    def serialize_content_list(self, content_list, analysis):
         serialized = []
-        for content in content_list:
+        for content, readability in zip(content_list, analysis):
             serialized.append({
                 'title': self.get_content_title(content),
                 'id': content.id,
                 'content_id': self.get_content_id(content),
                 'content_type': self.get_content_type(content),
-                'readability': self.analyze_content(content),
+                'readability': readability,
                 'related_content': self.serialize_related_content(content)
             })
         return serialized
@@ -151,7 +164,9 @@ class ContentMapView(BaseWebsiteView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.content_list:
-            context['content_list'] = self.serialize_content_list(self.content_list)
+            analysis, corpus = self.analyze_content_list(self.content_list)
+            context['content_list'] = self.serialize_content_list(self.content_list, analysis)
+            context['readability_distribution'] = self.serialize_readability_distribution(corpus)
         return context
 
     def setup(self, request, content_id=None, *args, **kwargs):
@@ -160,3 +175,134 @@ class ContentMapView(BaseWebsiteView):
             self.content_list = self.get_content_list(content_id)
             if not self.content_list:
                 raise Http404('Not found')
+
+
+class ContentMapExportView(ContentMapView):
+
+    cache_pages = False
+    export_batch_size = 100
+
+    def setup(self, request, *args, **kwargs):
+        BaseWebsiteView.setup(self, request, *args, **kwargs)
+
+    def iterate_content(self, content_id):
+        queryset = self.get_content_queryset(content_id)
+        if queryset is None:
+            for content in self.get_content_list(content_id):
+                yield content
+            return
+        for item in queryset.iterator(chunk_size=self.export_batch_size):
+            if isinstance(item, QuestionInCategory):
+                yield item.question
+            else:
+                yield item
+
+    def iterate_batches(self, contents):
+        while True:
+            batch = list(islice(contents, self.export_batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def get_existing_content_keys(self, keys):
+        existing_keys = set()
+        for content_type_id in set([content_type_id for content_type_id, object_id in keys]):
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is None:
+                continue
+            object_ids = model.objects.filter(
+                id__in = set([object_id for _content_type_id, object_id in keys if _content_type_id == content_type_id])
+            ).values_list('id', flat=True)
+            existing_keys.update([(content_type_id, object_id) for object_id in object_ids])
+        return existing_keys
+
+    def get_related_content_ids(self, content_list):
+        names = ['question-{id}'.format(id=content.id) for content in content_list]
+        list_ids = {}
+        related_lists = RelatedItemsList.objects.filter(
+            name__in = names
+        ) \
+        .order_by('id') \
+        .values_list('id', 'name')
+        for list_id, name in related_lists:
+            list_ids.setdefault(name, list_id)
+        related_ids = {list_id: [] for list_id in list_ids.values()}
+        related_items = list(RelatedItem.objects.filter(
+            item_list_id__in = list_ids.values()
+        ) \
+        .order_by('order') \
+        .values_list('item_list_id', 'content_type_id', 'object_id'))
+        existing_keys = self.get_existing_content_keys([(content_type_id, object_id) for list_id, content_type_id, object_id in related_items])
+        for list_id, content_type_id, object_id in related_items:
+            key = self.CONTENT_TYPE_KEYS.get(ContentType.objects.get_for_id(content_type_id).model_class())
+            if key is not None and (content_type_id, object_id) in existing_keys:
+                related_ids[list_id].append('{key}-{id}'.format(
+                    key = key,
+                    id = object_id
+                ))
+        return [related_ids.get(list_ids.get(name), []) for name in names]
+
+    def serialize_export_row(self, content, readability, related_content_ids):
+        return {
+            'title': self.get_content_title(content),
+            'id': content.id,
+            'content_id': self.get_content_id(content),
+            'content_type': self.get_content_type(content),
+            'readability': {name: readability.get(name) for name in EXPORTED_READABILITY_FIELDS},
+            'related_content': related_content_ids
+        }
+
+    def iterate_rows(self, contents):
+        for batch in self.iterate_batches(contents):
+            analysis, corpus = self.analyze_content_list(batch)
+            related_content_ids = self.get_related_content_ids(batch)
+            for content, readability, _related_content_ids in zip(batch, analysis, related_content_ids):
+                yield self.serialize_export_row(content, readability, _related_content_ids)
+
+    def stream_json(self, rows):
+        yield '['
+        for index, row in enumerate(rows):
+            if index:
+                yield ','
+            yield json.dumps(row)
+        yield ']'
+
+    def escape_csv_cell(self, value):
+        if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+            return "'" + value
+        return value
+
+    def stream_csv(self, rows):
+        writer = csv.writer(StreamBuffer())
+        yield writer.writerow(['title', 'content_id', 'content_type'] + EXPORTED_READABILITY_FIELDS + ['related_content'])
+        for row in rows:
+            yield writer.writerow([self.escape_csv_cell(value) for value in (
+                [row['title'], row['content_id'], row['content_type']]
+                + [row['readability'][name] for name in EXPORTED_READABILITY_FIELDS]
+                + [' '.join(row['related_content'])]
+            )])
+
+    def get_export_name(self, content_id):
+        if self.get_content_queryset(content_id) is not None:
+            return content_id
+        content = self.get_content_from_id(content_id)
+        if content:
+            return self.get_content_id(content)
+        related_list = RelatedItemsList.objects.filter(name=content_id).first()
+        if related_list:
+            return 'related-list-{id}'.format(id=related_list.id)
+        return 'content'
+
+    def get(self, request, content_id, export_format):
+        contents = self.iterate_content(content_id)
+        first_content = next(contents, None)
+        if first_content is None:
+            raise Http404('Not found')
+        rows = self.iterate_rows(chain([first_content], contents))
+        if export_format == 'csv':
+            response = StreamingHttpResponse(self.stream_csv(rows), content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="content-map-{name}.csv"'.format(
+                name = self.get_export_name(content_id)
+            )
+            return response
+        return StreamingHttpResponse(self.stream_json(rows), content_type='application/json')
@@ -1,7 +1,9 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 
 from ckeditor.fields import RichTextField
 
+from app.ordering import get_next_order
 from patients.models import AbstractOrderable
 from patients.models import Patient
 
@@ -27,6 +29,8 @@ class FrequentlyAskedQuestion(models.Model):
 
     @property
     def number_of_responses(self):
+        if hasattr(self, '_number_of_responses'):
+            return self._number_of_responses
         return len(self.responses)
 
     def get_responses(self):
@@ -108,7 +112,7 @@ class Category(AbstractOrderable):
 
     def save(self, *args, **kwargs):
         if not self.order:
-            self.order = (Category.objects.count()) + 1 * 10
+            self.order = get_next_order(Category.objects.all())
         super().save(*args, **kwargs)
 
     @property
@@ -121,6 +125,21 @@ class Category(AbstractOrderable):
         .all()
         return [qc.question for qc in questionCategories]
 
+class QuestionInCategoryQuerySet(models.QuerySet):
+
+    def with_number_of_responses(self):
+        response_counts = Answer.objects.filter(
+            question = models.OuterRef('question_id'),
+            published = True
+        ) \
+        .order_by() \
+        .values('question_id') \
+        .annotate(count = models.Count('id')) \
+        .values('count')
+        return self.annotate(
+            number_of_responses = Coalesce(models.Subquery(response_counts), models.Value(0))
+        )
+
 class QuestionInCategory(models.Model):
     category = models.ForeignKey(
         Category,
@@ -133,3 +152,5 @@ class QuestionInCategory(models.Model):
         related_name = '+'
     )
     order = models.PositiveIntegerField()
+
+    objects = QuestionInCategoryQuerySet.as_manager()
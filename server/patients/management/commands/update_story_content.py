@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from patients.models import PatientStory
+
+class Command(BaseCommand):
+    help = 'Precomputes the link-free and popover versions of patient story content'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action = 'store_true',
+            help = 'Recompute stories even when their content has not changed'
+        )
+
+    def handle(self, *args, **options):
+        updated = 0
+        for story in PatientStory.objects.all():
+            if story.update_derived_content(force=options['force']):
+                story.save()
+                updated += 1
+        self.stdout.write(self.style.SUCCESS('Updated %d patient stories' % (updated)))
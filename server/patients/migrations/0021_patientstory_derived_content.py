@@ -0,0 +1,28 @@
+# Generated by Django 3.1.1 on 2026-10-18 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0020_auto_20210223_0550'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientstory',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='patientstory',
+            name='content_with_popovers',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='patientstory',
+            name='content_without_links',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.1.1 on 2026-10-18 15:02
+
+from django.db import migrations, models
+import re
+
+from slugify import slugify
+
+
+def parse_number(value):
+    match = re.search(r'-?(\d+)(\.\d+)?', value or '')
+    if not match or int(match.group(1)) > 2147483647:
+        return None
+    return -int(match.group(1)) if match.group(0).startswith('-') else int(match.group(1))
+
+
+def fill_attribute_values(apps, schema_editor):
+    PatientAttribute = apps.get_model('patients', 'PatientAttribute')
+    patient_attributes = list(PatientAttribute.objects.select_related('attribute').all())
+    for patient_attribute in patient_attributes:
+        patient_attribute.attribute_key = slugify(patient_attribute.attribute.name)
+        patient_attribute.numeric_value = parse_number(patient_attribute.value)
+    PatientAttribute.objects.bulk_update(patient_attributes, ['attribute_key', 'numeric_value'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0021_patientstory_derived_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientattribute',
+            name='attribute_key',
+            field=models.SlugField(blank=True, editable=False, max_length=250, null=True),
+        ),
+        migrations.AddField(
+            model_name='patientattribute',
+            name='numeric_value',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='patientattribute',
+            index=models.Index(fields=['attribute_key', 'numeric_value'], name='patients_pa_attribu_6babba_idx'),
+        ),
+        migrations.RunPython(fill_attribute_values, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.1.1 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+from slugify import slugify
+
+
+def get_unique_slug(name, used_slugs):
+    base_slug = slugify(name or '')
+    if not base_slug:
+        return None
+    slug = base_slug
+    suffix = 2
+    while slug in used_slugs:
+        slug = '{}-{}'.format(base_slug, suffix)
+        suffix += 1
+    used_slugs.add(slug)
+    return slug
+
+def fill_slugs(apps, schema_editor):
+    Attribute = apps.get_model('patients', 'Attribute')
+    PatientAttribute = apps.get_model('patients', 'PatientAttribute')
+    attributes = list(Attribute.objects.order_by('id').all())
+    used_slugs = set()
+    for attribute in attributes:
+        attribute.slug = get_unique_slug(attribute.name, used_slugs)
+        PatientAttribute.objects.filter(attribute=attribute).update(attribute_key=attribute.slug)
+    Attribute.objects.bulk_update(attributes, ['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0022_patientattribute_values'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attribute',
+            name='slug',
+            field=models.SlugField(editable=False, max_length=260, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_slugs, migrations.RunPython.noop),
+    ]
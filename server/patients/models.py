@@ -1,6 +1,7 @@
 from io import BytesIO
 from django.core.files import File
 from django.db import models
+from django.db.models.functions import Coalesce
 from PIL import Image
 from PIL import ImageOps
 import re
@@ -8,13 +9,67 @@ import re
 from ckeditor.fields import RichTextField
 from slugify import slugify
 
+from app.ordering import get_next_order
+from resources.html import add_resource_popovers
+from resources.html import get_content_hash
+from resources.html import remove_links
 from resources.models import Resource
 from tags.models import Tag
+from tags.slugs import get_unique_slug
+
+ATTRIBUTE_NUMBER = re.compile(r'-?(\d+)(\.\d+)?')
+MAX_ATTRIBUTE_NUMBER = 2147483647
+
+def parse_attribute_number(value):
+    match = ATTRIBUTE_NUMBER.search(value or '')
+    if not match:
+        return None
+    number = int(match.group(1))
+    if number > MAX_ATTRIBUTE_NUMBER:
+        return None
+    if match.group(0).startswith('-'):
+        return -number
+    return number
+
+class PatientQuerySet(models.QuerySet):
+
+    def with_attribute_value(self, name, keys):
+        values = []
+        for key in keys:
+            values.append(models.Subquery(
+                PatientAttribute.objects.filter(
+                    patient = models.OuterRef('pk'),
+                    attribute_key = slugify(key),
+                    numeric_value__isnull = False
+                ) \
+                .order_by('attribute__order') \
+                .values('numeric_value')[:1]
+            ))
+        if len(values) > 1:
+            value = Coalesce(*values)
+        else:
+            value = values[0]
+        return self.annotate(**{name: value})
+
+    def filter_attribute_range(self, keys, minimum=None, maximum=None):
+        queryset = self.with_attribute_value('range_value', keys)
+        if minimum is not None:
+            queryset = queryset.filter(range_value__gte = minimum)
+        if maximum is not None:
+            queryset = queryset.filter(range_value__lte = maximum)
+        return queryset
+
+    def order_by_attribute_value(self, keys):
+        return self.with_attribute_value('sort_value', keys) \
+        .annotate(sort_value_or_zero = Coalesce('sort_value', models.Value(0))) \
+        .order_by('-sort_value_or_zero', 'id')
 
 class Patient(models.Model):
     name = models.CharField(max_length=50)
     published = models.BooleanField(default=False)
 
+    objects = PatientQuerySet.as_manager()
+
     @property
     def published_tags(self):
         return self.tags.filter(
@@ -60,20 +115,32 @@ class Patient(models.Model):
             patient = self
         ).all()
 
+    @property
+    def attribute_values_by_key(self):
+        if not hasattr(self, '_attribute_values_by_key'):
+            if not hasattr(self, '_all_attribute_values'):
+                self._all_attribute_values = self.get_all_patient_attributes()
+            self._attribute_values_by_key = {}
+            for attribute in self._all_attribute_values:
+                self._attribute_values_by_key.setdefault(attribute.key, attribute)
+        return self._attribute_values_by_key
+
+    def get_patient_attribute(self, key):
+        if key in self.attribute_values_by_key:
+            return self.attribute_values_by_key[key]
+        return self.attribute_values_by_key.get(slugify(key))
+
     def get_attribute(self, key):
-        if not hasattr(self, '_all_attribute_values'):
-            self._all_attribute_values = self.get_all_patient_attributes()
-        for attribute in self._all_attribute_values:
-            if attribute.key == slugify(key):
-                return attribute.value
+        patient_attribute = self.get_patient_attribute(key)
+        if patient_attribute:
+            return patient_attribute.value
         return None
 
     def get_attribute_as_int(self, key):
-        value = self.get_attribute(key)
-        if value is None:
-            return value
-        else:
-            return int(re.sub('\D','',value))
+        patient_attribute = self.get_patient_attribute(key)
+        if patient_attribute:
+            return patient_attribute.get_numeric_value()
+        return None
 
     def get_value(self, keys):
         for key in keys:
@@ -132,6 +199,12 @@ class AbstractOrderable(models.Model):
 
 class Attribute(AbstractOrderable):
     name = models.CharField(max_length=250)
+    slug = models.SlugField(
+        editable = False,
+        max_length = 260,
+        null = True,
+        unique = True
+    )
     order = models.PositiveIntegerField()
     published = models.BooleanField(default = True)
 
@@ -144,9 +217,15 @@ class Attribute(AbstractOrderable):
     )
 
     def save(self, *args, **kwargs):
+        self.slug = get_unique_slug(self, self.name)
         if not self.order:
-            self.order = (Issue.objects.count() + 1) * 10
+            self.order = get_next_order(Attribute.objects.all())
         super().save(*args, **kwargs)
+        PatientAttribute.objects.filter(
+            attribute = self
+        ) \
+        .exclude(attribute_key = self.slug) \
+        .update(attribute_key = self.slug)
 
     def __str__(self):
         return self.name
@@ -173,15 +252,46 @@ class PatientAttribute(models.Model):
     )
     value = models.CharField(max_length=250)
 
+    attribute_key = models.SlugField(
+        blank = True,
+        db_index = True,
+        editable = False,
+        max_length = 250,
+        null = True
+    )
+    numeric_value = models.IntegerField(
+        blank = True,
+        db_index = True,
+        editable = False,
+        null = True
+    )
+
     objects = PatientAttributeManager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['attribute_key', 'numeric_value'])
+        ]
+
+    def save(self, *args, **kwargs):
+        self.attribute_key = self.attribute.slug
+        self.numeric_value = parse_attribute_number(self.value)
+        super().save(*args, **kwargs)
+
     @property
     def name(self):
         return self.attribute.name
 
     @property
     def key(self):
-        return slugify(self.attribute.name)
+        if self.attribute_key:
+            return self.attribute_key
+        return self.attribute.slug
+
+    def get_numeric_value(self):
+        if self.numeric_value is not None and self.attribute_key:
+            return self.numeric_value
+        return parse_attribute_number(self.value)
 
     @property
     def description(self):
@@ -207,6 +317,48 @@ class PatientStory(AbstractOrderable):
         blank = True
     )
 
+    content_hash = models.CharField(
+        blank = True,
+        editable = False,
+        max_length = 40,
+        null = True
+    )
+    content_without_links = models.TextField(
+        blank = True,
+        editable = False,
+        null = True
+    )
+    content_with_popovers = models.TextField(
+        blank = True,
+        editable = False,
+        null = True
+    )
+
+    def save(self, *args, **kwargs):
+        self.update_derived_content()
+        super().save(*args, **kwargs)
+
+    def has_current_derived_content(self):
+        return self.content_hash == get_content_hash(self.content)
+
+    def update_derived_content(self, force=False):
+        if self.has_current_derived_content() and not force:
+            return False
+        self.content_hash = get_content_hash(self.content)
+        self.content_without_links = remove_links(self.content)
+        self.content_with_popovers = add_resource_popovers(self.content)
+        return True
+
+    def get_content_without_links(self):
+        if not self.has_current_derived_content():
+            return remove_links(self.content)
+        return self.content_without_links
+
+    def get_content_with_popovers(self):
+        if not self.has_current_derived_content():
+            return add_resource_popovers(self.content)
+        return self.content_with_popovers
+
 class PatientStoryHighlight(AbstractOrderable):
     patient = models.ForeignKey(
         Patient,
@@ -234,7 +386,7 @@ class Issue(AbstractOrderable):
 
     def save(self, *args, **kwargs):
         if not self.order:
-            self.order = (Issue.objects.count() + 1) * 10
+            self.order = get_next_order(Issue.objects.all())
         super().save(*args, **kwargs)
 
     def __str__(self):
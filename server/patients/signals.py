@@ -0,0 +1,55 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
+
+from resources.models import Resource
+from tags.signals import fill_raw_slug
+
+from .models import Attribute
+from .models import PatientAttribute
+from .models import PatientStory
+from .models import parse_attribute_number
+
+def remember_previous_slug(sender, instance, raw=False, **kwargs):
+    instance._previous_slug = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_slug = Resource.objects.filter(
+        pk = instance.pk
+    ) \
+    .values_list('slug', flat=True) \
+    .first()
+
+def refresh_linked_stories(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    slugs = set([slug for slug in [instance.slug, getattr(instance, '_previous_slug', None)] if slug])
+    if not slugs:
+        return
+    linked = Q()
+    for slug in slugs:
+        linked |= Q(content__contains = 'resources/{slug}'.format(slug=slug))
+    stories = PatientStory.objects.filter(linked).all()
+    for story in stories:
+        story.update_derived_content(force=True)
+        story.save()
+
+def fill_raw_attribute_values(sender, instance, raw=False, **kwargs):
+    if not raw:
+        return
+    if not instance.attribute_key:
+        instance.attribute_key = Attribute.objects.filter(
+            pk = instance.attribute_id
+        ) \
+        .values_list('slug', flat=True) \
+        .first()
+    if instance.numeric_value is None:
+        instance.numeric_value = parse_attribute_number(instance.value)
+
+def connect_signals():
+    pre_save.connect(fill_raw_slug, sender=Attribute)
+    pre_save.connect(fill_raw_attribute_values, sender=PatientAttribute)
+    pre_save.connect(remember_previous_slug, sender=Resource)
+    post_save.connect(refresh_linked_stories, sender=Resource)
+    post_delete.connect(refresh_linked_stories, sender=Resource)
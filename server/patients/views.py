@@ -1,8 +1,6 @@
 import logging
-import re
 import random
 
-from bs4 import BeautifulSoup
 from django import forms
 from django.http import Http404
 from django.shortcuts import render
@@ -49,23 +47,6 @@ class PatientView(TemplateView):
         except Patient.DoesNotExist:
             raise Http404('Patient does not exist')
 
-    def add_resource_popovers(self, content):
-        if content:
-            soup = BeautifulSoup(content, 'html.parser')
-            for link in soup.find_all('a'):
-                href = link.get('href')
-                if href:
-                    resource = None
-                    for resource_slug in re.findall('.*resources\/(.*)$', href):
-                        resource = Resource.objects.filter(slug = resource_slug).first()
-                    if resource:
-                        link['data-toggle'] = "popover"
-                        link['class'] = "popover-highlight"
-                        link['data-content'] = resource.content
-            return str(soup)
-        else:
-            return content
-
 
 class PatientStoryView(PatientView):
 
@@ -81,7 +62,7 @@ class PatientStoryView(PatientView):
             stories.append({
                 'id': story.id,
                 'title': story.title,
-                'content': self.add_resource_popovers(story.content)
+                'content': story.get_content_with_popovers()
             })
         context['stories'] = stories
         return context
@@ -120,6 +101,6 @@ class PatientStoryTableOfContentsView(PatientView):
         context['story'] = {
             'id': story.id,
             'title': story.title,
-            'content': self.add_resource_popovers(story.content)
+            'content': story.get_content_with_popovers()
         }
         return context
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ResourcesConfig(AppConfig):
     name = 'resources'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
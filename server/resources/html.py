@@ -0,0 +1,54 @@
+import hashlib
+import re
+
+from bs4 import BeautifulSoup
+
+from app.cache import get_local_value
+
+from .models import Resource
+
+def get_content_hash(content):
+    return hashlib.sha1((content or '').encode('utf-8')).hexdigest()
+
+def get_resource_slugs(href):
+    return re.findall('.*resources\/(.*)$', href)
+
+def build_resource_slug_index():
+    index = {}
+    resources = Resource.objects.filter(
+        published = True
+    ).values_list('id', 'slug')
+    for resource_id, slug in resources:
+        if slug:
+            index.setdefault(slug, resource_id)
+    return index
+
+def get_resource_slug_index():
+    return get_local_value('resource-slug-index', 'resources', build_resource_slug_index)
+
+def remove_links(content):
+    if not content:
+        return content
+    soup = BeautifulSoup(content, 'html.parser')
+    for link in soup.find_all('a'):
+        link_replacement = soup.new_tag('span')
+        link_replacement.string = link.text
+        link.replace_with(link_replacement)
+    return str(soup)
+
+def add_resource_popovers(content):
+    if not content:
+        return content
+    resource_ids = get_resource_slug_index()
+    soup = BeautifulSoup(content, 'html.parser')
+    for link in soup.find_all('a'):
+        href = link.get('href')
+        if href:
+            resource_id = None
+            for resource_slug in get_resource_slugs(href):
+                resource_id = resource_ids.get(resource_slug)
+            if resource_id:
+                link['data-toggle'] = "popover"
+                link['class'] = "popover-highlight"
+                link['data-resource-id'] = str(resource_id)
+    return str(soup)
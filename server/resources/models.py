@@ -2,6 +2,8 @@ from django.db import models
 from ckeditor.fields import RichTextField
 from slugify import slugify
 
+from app.ordering import get_next_order
+
 class AbstractResource(models.Model):
     name = models.CharField(max_length = 140)
     slug = models.CharField(null=True, max_length=160)
@@ -68,7 +70,7 @@ class Article(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.order:
-            self.order = (Article.objects.count() + 1) * 10
+            self.order = get_next_order(Article.objects.all())
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+
+from app.cache import update_version
+
+from .models import Article
+from .models import Resource
+
+def invalidate_resources(sender, **kwargs):
+    update_version('resources')
+
+def invalidate_articles(sender, **kwargs):
+    update_version('articles')
+
+def connect_signals():
+    post_save.connect(invalidate_articles, sender=Article)
+    post_delete.connect(invalidate_articles, sender=Article)
+    post_save.connect(invalidate_resources, sender=Resource)
+    post_delete.connect(invalidate_resources, sender=Resource)
@@ -0,0 +1,39 @@
+from app.cache import get_local_value
+
+from .models import Article
+
+class ArticleTree:
+
+    def __init__(self, articles):
+        self.articles = {article.id: article for article in articles}
+        self.children_by_parent_id = {}
+        for article in articles:
+            self.children_by_parent_id.setdefault(article.parent_id, []).append(article)
+        for article in articles:
+            article._children = self.get_children(article)
+
+    def get_article(self, article_id):
+        return self.articles.get(article_id)
+
+    def get_children(self, article):
+        return self.children_by_parent_id.get(article.id, [])
+
+    def get_top_level_articles(self):
+        return list(self.children_by_parent_id.get(None, []))
+
+    def get_all_articles(self):
+        all_articles = []
+        for article in self.get_top_level_articles():
+            all_articles += [article] + self.get_children(article)
+        return all_articles
+
+def build_article_tree():
+    articles = Article.objects.filter(
+        published = True
+    ) \
+    .order_by('order', 'title') \
+    .all()
+    return ArticleTree(list(articles))
+
+def get_article_tree():
+    return get_local_value('article-tree', 'articles', build_article_tree)
@@ -1,6 +1,14 @@
 from django.http import Http404
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.views.generic.base import TemplateView
 
+from app.cache import get_local_value
+from app.cache import get_version
+
 from .models import Resource
 
 class ResourceListView(TemplateView):
@@ -47,3 +55,21 @@ class AllResourcesView(TemplateView):
         context = super().get_context_data(**kwargs)
         context['resources'] = Resource.objects.filter().all()
         return context
+
+
+def get_resources_etag(request, *args, **kwargs):
+    return get_version('resources')
+
+def build_resource_popovers():
+    resources = Resource.objects.filter(
+        published = True
+    ).values_list('id', 'content')
+    return {resource_id: content for resource_id, content in resources}
+
+@method_decorator(cache_control(public=True, max_age=60 * 5), name='dispatch')
+@method_decorator(condition(etag_func=get_resources_etag), name='dispatch')
+class ResourcePopoversView(View):
+
+    def get(self, request):
+        popovers = get_local_value('resource-popovers', 'resources', build_resource_popovers)
+        return JsonResponse(popovers)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class StudySessionsConfig(AppConfig):
     name = 'study_sessions'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
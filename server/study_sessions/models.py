@@ -1,7 +1,21 @@
+from django.core.cache import cache
 from django.db import models
 
+class StudySessionManager(models.Manager):
+
+    def get_cached(self, study_session_id):
+        values = cache.get(self.model.get_cache_key(study_session_id))
+        if values is None:
+            study_session = self.get(id=study_session_id)
+            study_session.update_cache()
+            return study_session
+        field_names = list(values.keys())
+        return self.model.from_db(self.db, field_names, [values[name] for name in field_names])
+
 class StudySession(models.Model):
 
+    CACHE_TIMEOUT = 60 * 60 * 24
+
     persona = models.CharField(
         max_length=150,
         null=True
@@ -13,3 +27,16 @@ class StudySession(models.Model):
     start = models.DateTimeField(
         auto_now_add=True
     )
+
+    objects = StudySessionManager()
+
+    @staticmethod
+    def get_cache_key(study_session_id):
+        return 'study-session-{id}'.format(id=study_session_id)
+
+    def update_cache(self):
+        values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+        cache.set(self.get_cache_key(self.id), values, self.CACHE_TIMEOUT)
+
+    def clear_cache(self):
+        cache.delete(self.get_cache_key(self.id))
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+
+from .models import StudySession
+
+def update_study_session_cache(sender, instance, **kwargs):
+    instance.update_cache()
+
+def clear_study_session_cache(sender, instance, **kwargs):
+    instance.clear_cache()
+
+def connect_signals():
+    post_save.connect(update_study_session_cache, sender=StudySession)
+    post_delete.connect(clear_study_session_cache, sender=StudySession)
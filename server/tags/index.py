@@ -0,0 +1,117 @@
+from django.contrib.contenttypes.models import ContentType
+
+from app.cache import get_local_value
+
+from .models import Tag
+from .models import TagCategory
+from .models import TaggedContent
+
+class TagIndex:
+
+    def __init__(self, tags, categories, tagged_contents):
+        self.tags = {tag.id: tag for tag in tags}
+        self.categories = {category.id: category for category in categories}
+        self.categories_by_slug = {category.slug: category for category in categories}
+        self.tag_ids_by_content = {}
+        self.content_bits = {}
+        self.tag_masks = {}
+        self.tag_ids_by_category_id = {}
+        for tag_id, content_type_id, object_id in tagged_contents:
+            content_key = (content_type_id, object_id)
+            self.tag_ids_by_content.setdefault(content_key, []).append(tag_id)
+            if content_key not in self.content_bits:
+                self.content_bits[content_key] = 1 << len(self.content_bits)
+            self.tag_masks[tag_id] = self.tag_masks.get(tag_id, 0) | self.content_bits[content_key]
+        for tag in tags:
+            if tag.category_id:
+                self.tag_ids_by_category_id.setdefault(tag.category_id, []).append(tag.id)
+
+    def get_category_tags(self, category_slug):
+        category = self.categories_by_slug.get(category_slug)
+        if category is None:
+            return []
+        return [self.tags[tag_id] for tag_id in self.tag_ids_by_category_id.get(category.id, [])]
+
+    def get_content_key(self, content_object):
+        content_type = ContentType.objects.get_for_model(content_object)
+        return (content_type.id, content_object.id)
+
+    def get_tags_for_content(self, content_object):
+        tag_ids = self.tag_ids_by_content.get(self.get_content_key(content_object), [])
+        return [self.tags[tag_id] for tag_id in tag_ids]
+
+    def get_tags_for_content_items(self, content_items):
+        tags = []
+        tag_ids = set()
+        for item in content_items:
+            for tag in self.get_tags_for_content(item):
+                if tag.id not in tag_ids:
+                    tag_ids.add(tag.id)
+                    tags.append(tag)
+        return tags
+
+    def get_content_bit(self, content_object):
+        return self.content_bits.get(self.get_content_key(content_object), 0)
+
+    def get_content_items_mask(self, content_items):
+        mask = 0
+        for item in content_items:
+            mask |= self.get_content_bit(item)
+        return mask
+
+    def get_tag_mask(self, tag):
+        return self.tag_masks.get(tag.id, 0)
+
+    def get_published_categories(self, category_ids):
+        categories = [self.categories[_id] for _id in category_ids if _id in self.categories]
+        categories = [category for category in categories if category.published]
+        categories.sort(key=lambda category: (category.order, category.id))
+        return categories
+
+class TagFacets:
+
+    def __init__(self, tag_index, content_items, category_tags, selected_tag_slugs):
+        self.tag_index = tag_index
+        self.category_tags = category_tags
+        self.content_items_mask = tag_index.get_content_items_mask(content_items)
+        self.selected_tags = {}
+        self.selected_masks = {}
+        for category, tags in category_tags:
+            selected_slugs = selected_tag_slugs.get(category.slug, [])
+            selected_tags = [tag for tag in tags if tag.slug in selected_slugs]
+            if selected_tags:
+                self.selected_tags[category.id] = selected_tags
+                self.selected_masks[category.id] = 0
+                for tag in selected_tags:
+                    self.selected_masks[category.id] |= tag_index.get_tag_mask(tag)
+
+    def get_mask(self, exclude_category=None):
+        mask = self.content_items_mask
+        for category_id, category_mask in self.selected_masks.items():
+            if exclude_category is None or category_id != exclude_category.id:
+                mask &= category_mask
+        return mask
+
+    def is_selected(self, category, tag):
+        return tag in self.selected_tags.get(category.id, [])
+
+    def count(self, category, tag):
+        mask = self.tag_index.get_tag_mask(tag) & self.get_mask(exclude_category=category)
+        return bin(mask).count('1')
+
+    def filter(self, content_items):
+        if not self.selected_masks:
+            return list(content_items)
+        mask = self.get_mask()
+        return [item for item in content_items if self.tag_index.get_content_bit(item) & mask]
+
+def build_tag_index():
+    tags = list(Tag.objects.order_by('category_id', 'order', 'id').all())
+    categories = list(TagCategory.objects.all())
+    tagged_contents = TaggedContent.objects \
+    .order_by('id') \
+    .values_list('tag_id', 'content_type_id', 'object_id')
+    return TagIndex(tags, categories, list(tagged_contents))
+
+def get_tag_index():
+    return get_local_value('tag-index', 'tags', build_tag_index)
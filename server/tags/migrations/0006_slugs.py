@@ -0,0 +1,48 @@
+# Generated by Django 3.1.1 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+from slugify import slugify
+
+
+def get_unique_slug(name, used_slugs):
+    base_slug = slugify(name or '')
+    if not base_slug:
+        return None
+    slug = base_slug
+    suffix = 2
+    while slug in used_slugs:
+        slug = '{}-{}'.format(base_slug, suffix)
+        suffix += 1
+    used_slugs.add(slug)
+    return slug
+
+def fill_slugs(apps, schema_editor):
+    for model_name in ['Tag', 'TagCategory']:
+        model = apps.get_model('tags', model_name)
+        instances = list(model.objects.order_by('id').all())
+        used_slugs = set()
+        for instance in instances:
+            instance.slug = get_unique_slug(instance.name, used_slugs)
+        model.objects.bulk_update(instances, ['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0005_auto_20210223_1541'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='slug',
+            field=models.SlugField(editable=False, max_length=160, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='tagcategory',
+            name='slug',
+            field=models.SlugField(editable=False, max_length=160, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_slugs, migrations.RunPython.noop),
+    ]
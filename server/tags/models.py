@@ -1,26 +1,40 @@
-from slugify import slugify
-
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
+from app.ordering import get_next_order
+
+from .slugs import get_unique_slug
+
 class TagCategory(models.Model):
     name = models.CharField(max_length=150)
+    slug = models.SlugField(
+        editable = False,
+        max_length = 160,
+        null = True,
+        unique = True
+    )
     order = models.PositiveIntegerField()
     published = models.BooleanField(default=True)
 
     class Meta:
         ordering = ['order']
 
-    @property
-    def slug(self):
-        return slugify(self.name)
+    def save(self, *args, **kwargs):
+        self.slug = get_unique_slug(self, self.name)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
 class Tag(models.Model):
     name = models.CharField(max_length = 150)
+    slug = models.SlugField(
+        editable = False,
+        max_length = 160,
+        null = True,
+        unique = True
+    )
     order = models.PositiveIntegerField(
         blank = True,
         null = True
@@ -38,13 +52,10 @@ class Tag(models.Model):
     class Meta:
         ordering = ['category', 'order', 'name']
 
-    @property
-    def slug(self):
-        return slugify(self.name)
-
     def save(self, *args, **kwargs):
+        self.slug = get_unique_slug(self, self.name)
         if not self.order:
-            self.order = (Tag.objects.filter(category=self.category).count() + 1) * 10
+            self.order = get_next_order(Tag.objects.filter(category=self.category))
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
+
+from app.cache import update_version
+
+from .models import Tag
+from .models import TagCategory
+from .models import TaggedContent
+from .slugs import get_unique_slug
+
+def invalidate_tags(sender, **kwargs):
+    update_version('tags')
+
+def fill_raw_slug(sender, instance, raw=False, **kwargs):
+    if raw and not instance.slug:
+        instance.slug = get_unique_slug(instance, instance.name)
+
+def connect_signals():
+    for model in [Tag, TagCategory]:
+        pre_save.connect(fill_raw_slug, sender=model)
+    for model in [Tag, TagCategory, TaggedContent]:
+        post_save.connect(invalidate_tags, sender=model)
+        post_delete.connect(invalidate_tags, sender=model)
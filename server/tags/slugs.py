@@ -0,0 +1,15 @@
+from slugify import slugify
+
+def get_unique_slug(instance, value):
+    base_slug = slugify(value or '')
+    if not base_slug:
+        return None
+    queryset = type(instance)._default_manager.all()
+    if instance.pk:
+        queryset = queryset.exclude(pk=instance.pk)
+    slug = base_slug
+    suffix = 2
+    while queryset.filter(slug=slug).exists():
+        slug = '{}-{}'.format(base_slug, suffix)
+        suffix += 1
+    return slug
@@ -0,0 +1,46 @@
+from app.cache import get_local_value
+from faqs.models import FrequentlyAskedQuestion
+from patients.models import Patient
+from resources.models import Article
+
+def serialize_catalog_item(key, object_id, title):
+    return {
+        'title': title,
+        'content_id': '{key}-{id}'.format(key=key, id=object_id)
+    }
+
+def get_catalog_articles():
+    articles = Article.objects.filter(
+        published = True
+    ) \
+    .order_by('order', 'title') \
+    .values_list('id', 'title', 'parent_id')
+    children_by_parent_id = {}
+    for article_id, title, parent_id in articles:
+        children_by_parent_id.setdefault(parent_id, []).append((article_id, title))
+    catalog_articles = []
+    for article_id, title in children_by_parent_id.get(None, []):
+        catalog_articles.append((article_id, title))
+        catalog_articles += children_by_parent_id.get(article_id, [])
+    return catalog_articles
+
+def build_content_catalog():
+    questions = FrequentlyAskedQuestion.objects.filter(published=True).values_list('id', 'text')
+    patients = Patient.objects.filter(published=True).values_list('id', 'name')
+    return [
+        {
+            'title': 'Questions',
+            'items': [serialize_catalog_item('question', _id, text) for _id, text in questions]
+        },
+        {
+            'title': 'Patient Stories',
+            'items': [serialize_catalog_item('patient', _id, name) for _id, name in patients]
+        },
+        {
+            'title': 'Resource Articles',
+            'items': [serialize_catalog_item('resource', _id, title) for _id, title in get_catalog_articles()]
+        }
+    ]
+
+def get_content_catalog():
+    return get_local_value('content-catalog', 'content', build_content_catalog)
@@ -0,0 +1,80 @@
+from django.db.models import Count
+
+from faqs.models import Answer
+from faqs.models import FAQHighlight
+from faqs.models import FrequentlyAskedQuestion
+from patients.models import Patient
+from patients.models import PatientAttribute
+from patients.models import PatientStoryHighlight
+from resources.models import Article
+from resources.tree import get_article_tree
+
+def group_by(items, key):
+    grouped = {}
+    for item in items:
+        grouped.setdefault(getattr(item, key), []).append(item)
+    return grouped
+
+def load_articles(articles):
+    articles = list(articles)
+    if not articles:
+        return articles
+    article_tree = get_article_tree()
+    for article in articles:
+        article._children = article_tree.get_children(article)
+    return articles
+
+def load_questions(questions):
+    questions = list(questions)
+    if not questions:
+        return questions
+    question_ids = set([question.id for question in questions])
+    highlights = FAQHighlight.objects.filter(
+        question_id__in = question_ids,
+        published = True
+    ).order_by('order').all()
+    highlights_by_question = group_by(highlights, 'question_id')
+    uncounted_question_ids = set([question.id for question in questions if not hasattr(question, '_number_of_responses')])
+    response_counts = Answer.objects.filter(
+        question_id__in = uncounted_question_ids,
+        published = True
+    ) \
+    .order_by() \
+    .values('question_id') \
+    .annotate(count = Count('id'))
+    counts_by_question = {}
+    if uncounted_question_ids:
+        counts_by_question = {row['question_id']: row['count'] for row in response_counts}
+    for question in questions:
+        question._highlights = highlights_by_question.get(question.id, [])
+        if not hasattr(question, '_number_of_responses'):
+            question._number_of_responses = counts_by_question.get(question.id, 0)
+    return questions
+
+def load_patients(patients):
+    patients = list(patients)
+    if not patients:
+        return patients
+    patient_ids = set([patient.id for patient in patients])
+    patient_attributes = PatientAttribute.objects.filter(
+        patient_id__in = patient_ids
+    ).all()
+    attributes_by_patient = group_by(patient_attributes, 'patient_id')
+    story_highlights = PatientStoryHighlight.objects.filter(
+        patient_id__in = patient_ids,
+        published = True
+    ).all()
+    highlights_by_patient = group_by(story_highlights, 'patient_id')
+    for patient in patients:
+        all_attributes = attributes_by_patient.get(patient.id, [])
+        patient._all_attribute_values = all_attributes
+        patient._attributes = [pa for pa in all_attributes if pa.attribute.published]
+        patient._story_highlights = highlights_by_patient.get(patient.id, [])
+    return patients
+
+def load_contents(contents):
+    contents = list(contents)
+    load_articles([content for content in contents if isinstance(content, Article)])
+    load_questions([content for content in contents if isinstance(content, FrequentlyAskedQuestion)])
+    load_patients([content for content in contents if isinstance(content, Patient)])
+    return contents
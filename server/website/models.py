@@ -3,21 +3,96 @@ import random
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db import transaction
+
+from app.cache import update_version
+from app.ordering import get_next_order
 
 class RelatedItemsList(models.Model):
     name = models.CharField(max_length=500)
 
     @property
     def items(self):
-        return RelatedItem.objects.filter(
+        if not hasattr(self, '_items'):
+            self._items = self.get_items()
+        return self._items
+
+    @property
+    def content_list(self):
+        return [item.content_object for item in self.items]
+
+    def get_items(self):
+        if self.pk is None:
+            return []
+        items = RelatedItem.objects.filter(
             item_list = self
         ) \
         .order_by('order') \
+        .prefetch_related('content_object') \
         .all()
+        return list(items)
 
-    @property
-    def content_list(self):
-        return [item.content_object for item in RelatedItem.objects.order_by('order').filter(item_list = self).all()]
+    def sync_items(self, keys):
+        submitted_keys = set(keys)
+        with transaction.atomic():
+            existing_items = RelatedItem.objects.select_for_update().filter(
+                item_list = self
+            ) \
+            .values_list('id', 'content_type_id', 'object_id')
+            existing_keys = set()
+            removed_item_ids = []
+            for item_id, content_type_id, object_id in existing_items:
+                existing_keys.add((content_type_id, object_id))
+                if (content_type_id, object_id) not in submitted_keys:
+                    removed_item_ids.append(item_id)
+            if removed_item_ids:
+                RelatedItem.objects.filter(id__in=removed_item_ids).delete()
+            new_keys = []
+            for key in keys:
+                if key not in existing_keys:
+                    existing_keys.add(key)
+                    new_keys.append(key)
+            if new_keys:
+                next_order = get_next_order(RelatedItem.objects.filter(item_list=self))
+                RelatedItem.objects.bulk_create([
+                    RelatedItem(
+                        item_list = self,
+                        order = next_order + (index * 10),
+                        content_type_id = content_type_id,
+                        object_id = object_id
+                    ) for index, (content_type_id, object_id) in enumerate(new_keys)
+                ])
+                transaction.on_commit(lambda: update_version('pages'))
+        if hasattr(self, '_items'):
+            del self._items
+
+    def reorder_items(self, ordered_keys):
+        with transaction.atomic():
+            items = RelatedItem.objects.select_for_update().filter(
+                item_list = self
+            ) \
+            .order_by('order') \
+            .all()
+            items_by_key = {(item.content_type_id, item.object_id): item for item in items}
+            ordered_items = []
+            ordered_item_ids = set()
+            for key in ordered_keys:
+                item = items_by_key.get(key)
+                if item and item.pk not in ordered_item_ids:
+                    ordered_item_ids.add(item.pk)
+                    ordered_items.append(item)
+            RelatedItem.objects.filter(
+                item_list = self
+            ) \
+            .exclude(pk__in = [item.pk for item in ordered_items]) \
+            .delete()
+            for index, item in enumerate(ordered_items):
+                item.order = (index + 1) * 10
+            RelatedItem.objects.bulk_update(ordered_items, ['order'])
+            transaction.on_commit(lambda: update_version('pages'))
+        if hasattr(self, '_items'):
+            del self._items
+        return ordered_items
 
 class RelatedItem(models.Model):
     item_list = models.ForeignKey(
@@ -33,5 +108,5 @@ class RelatedItem(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.order:
-            self.order = (RelatedItem.objects.filter(item_list=self.item_list).count() + 1) * 10
+            self.order = get_next_order(RelatedItem.objects.filter(item_list=self.item_list))
         super().save(*args, **kwargs)
@@ -0,0 +1,59 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+
+from app.cache import update_version
+from faqs.models import Answer
+from faqs.models import Author
+from faqs.models import Category as FAQCategory
+from faqs.models import FAQHighlight
+from faqs.models import FrequentlyAskedQuestion
+from faqs.models import QuestionInCategory
+from patients.models import Attribute
+from patients.models import Patient
+from patients.models import PatientAttribute
+from patients.models import PatientStory
+from patients.models import PatientStoryHighlight
+from resources.models import Article
+from tags.models import Tag
+from tags.models import TagCategory
+from tags.models import TaggedContent
+
+from .models import RelatedItem
+from .models import RelatedItemsList
+
+CONTENT_MODELS = [
+    Answer,
+    Article,
+    Attribute,
+    FAQHighlight,
+    FrequentlyAskedQuestion,
+    Patient,
+    PatientAttribute,
+    PatientStoryHighlight
+]
+
+PAGE_MODELS = [
+    Author,
+    FAQCategory,
+    PatientStory,
+    QuestionInCategory,
+    RelatedItem,
+    RelatedItemsList,
+    Tag,
+    TagCategory,
+    TaggedContent
+]
+
+def invalidate_content(sender, **kwargs):
+    update_version('content')
+
+def invalidate_pages(sender, **kwargs):
+    update_version('pages')
+
+def connect_signals():
+    for model in CONTENT_MODELS:
+        post_save.connect(invalidate_content, sender=model)
+        post_delete.connect(invalidate_content, sender=model)
+    for model in PAGE_MODELS:
+        post_save.connect(invalidate_pages, sender=model)
+        post_delete.connect(invalidate_pages, sender=model)
@@ -1,19 +1,30 @@
+import hashlib
 import random
+import re
+from urllib.parse import urlencode
 
-from bs4 import BeautifulSoup
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.http import Http404
+from django.http import HttpResponse
 from django.http import HttpResponseRedirect
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import render
 from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.html import escape
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.views.generic.base import TemplateView
 from django.views import View
 
-from django.contrib.contenttypes.models import ContentType
-
+from app.cache import get_version
 from resources.models import Article
+from resources.tree import get_article_tree
 from faqs.models import FrequentlyAskedQuestion
-from faqs.models import Category as FAQCategory
+from faqs.models import QuestionInCategory
 from faqs.models import Answer
 from highlights.models import HighlightedContent
 from patients.models import Patient
@@ -21,14 +32,21 @@ from patients.models import PatientStory
 from patients.models import PatientStoryHighlight
 from patients.views import PatientStoryView as OGPatientStoryView
 from study_sessions.models import StudySession
-from tags.models import TaggedContent
-from tags.models import TagCategory
+from tags.index import get_tag_index
+from tags.index import TagFacets
 
+from .catalog import get_content_catalog
 from .forms import WebsiteConfigurationForm
+from .loaders import load_contents
+from .loaders import load_questions
 from .forms import MyCFStageForm
-from .models import RelatedItem
 from .models import RelatedItemsList
 
+CSRF_TOKEN_INPUT = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_TOKEN_PLACEHOLDER = '__csrf_token__'
+BACK_LINK_PLACEHOLDER = '__back_link__'
+BACK_LINK_ANCHOR = re.compile(r'<a[^>]*href="%s"[^>]*>.*?</a>' % (BACK_LINK_PLACEHOLDER))
+
 class BaseWebsiteView(TemplateView):
 
     CONTENT_TYPES = {
@@ -38,6 +56,7 @@ class BaseWebsiteView(TemplateView):
         'response': Answer,
         'resource': Article
     }
+    CONTENT_TYPE_KEYS = {model: key for key, model in CONTENT_TYPES.items()}
 
     study_session = None
 
@@ -57,6 +76,12 @@ class BaseWebsiteView(TemplateView):
 
     current_navigation_item = None
 
+    fragment_cache_timeout = 60 * 60 * 24
+
+    cache_pages = True
+    page_cache_timeout = 60 * 60
+    page_placeholders = False
+
     def setup(self, request, *args, **kwargs):
         super().setup(request, *args, **kwargs)
         if 'study_session_id' in request.session and request.session['study_session_id'] is not None:
@@ -64,9 +89,73 @@ class BaseWebsiteView(TemplateView):
         else:
             self.setup_session_configuration()
 
+    def dispatch(self, request, *args, **kwargs):
+        if not self.should_cache_page():
+            return self.fill_page_placeholders(super().dispatch(request, *args, **kwargs))
+        key = self.get_page_cache_key()
+        cached = cache.get(key)
+        if cached is not None:
+            return self.get_cached_page_response(cached)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(lambda response: self.cache_page_response(key, response))
+        return self.fill_page_placeholders(response)
+
+    def fill_page_placeholders(self, response):
+        if self.page_placeholders and hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(self.fill_rendered_page_placeholders)
+        return response
+
+    def fill_rendered_page_placeholders(self, response):
+        response.content = self.fill_page_content(response.content.decode(response.charset))
+
+    def fill_page_content(self, content):
+        if CSRF_TOKEN_PLACEHOLDER in content:
+            content = content.replace(CSRF_TOKEN_PLACEHOLDER, get_token(self.request))
+        return content
+
+    def should_cache_page(self):
+        if not self.cache_pages:
+            return False
+        if self.request.method not in ['GET', 'HEAD']:
+            return False
+        if self.request.user.is_authenticated:
+            return False
+        return True
+
+    def get_page_cache_variant(self):
+        variant = ['%s=%s' % (flag, bool(getattr(self, flag))) for flag in self.FEATURE_FLAGS]
+        variant.append('persona=%s' % (self.study_session.persona if self.study_session else ''))
+        variant.append('took_survey=%s' % (bool(self.request.session.get('survey-complete'))))
+        return variant
+
+    def get_page_cache_parameters(self):
+        return []
+
+    def get_page_cache_key(self):
+        variant = [
+            self.request.path,
+            urlencode(sorted(set(self.get_page_cache_parameters()))),
+            self.get_content_version(),
+            get_version('pages')
+        ] + self.get_page_cache_variant()
+        return 'page-%s' % (hashlib.md5('|'.join(variant).encode('utf-8')).hexdigest())
+
+    def cache_page_response(self, key, response):
+        content = response.content.decode(response.charset)
+        if self.request.META.get('CSRF_COOKIE_USED'):
+            content, holes = CSRF_TOKEN_INPUT.subn(r'\1%s\2' % (CSRF_TOKEN_PLACEHOLDER), content)
+            if not holes:
+                return
+        cache.set(key, (content, response['Content-Type']), self.page_cache_timeout)
+
+    def get_cached_page_response(self, cached):
+        content, content_type = cached
+        return HttpResponse(self.fill_page_content(content), content_type=content_type)
+
     def setup_study_session(self, study_session_id):
         try:
-            study_session = StudySession.objects.get(id=study_session_id)
+            study_session = StudySession.objects.get_cached(study_session_id)
             self.study_session = study_session
             if study_session.high_agency_version:
                 self.show_recommended_content = False
@@ -89,17 +178,31 @@ class BaseWebsiteView(TemplateView):
             if flag in self.request.session:
                 setattr(self, flag, self.request.session[flag])
 
+    def get_missing_related_list_cache_key(self, name):
+        return 'related-list-missing-{name}-{version}'.format(
+            name = name,
+            version = get_version('pages')
+        )
+
+    def find_related_list(self, name):
+        if not hasattr(self, '_related_lists'):
+            self._related_lists = {}
+        if name not in self._related_lists:
+            missing_key = self.get_missing_related_list_cache_key(name)
+            related_list = None
+            if not cache.get(missing_key):
+                related_list = RelatedItemsList.objects.filter(name=name).first()
+                if related_list is None:
+                    cache.set(missing_key, True, self.page_cache_timeout)
+            if related_list is None:
+                related_list = RelatedItemsList(name=name)
+            self._related_lists[name] = related_list
+        return self._related_lists[name]
+
     def get_related_list(self, question):
         if isinstance(question, RelatedItemsList):
             return question
-        try:
-            return RelatedItemsList.objects.get(
-                name = 'question-{id}'.format(id=question.id)
-            )
-        except RelatedItemsList.DoesNotExist:
-            return RelatedItemsList.objects.create(
-                name = 'question-{id}'.format(id=question.id)
-            )
+        return self.find_related_list('question-{id}'.format(id=question.id))
 
     def get_related_items(self, question):
         related_list = self.get_related_list(question)
@@ -112,8 +215,7 @@ class BaseWebsiteView(TemplateView):
     def render_related_content(self, content):
         related_list = self.get_related_list(content)
         rendered_content = []
-        for _content in related_list.content_list:
-            rendered = self.render_content(_content)
+        for rendered in self.render_contents(related_list.content_list):
             if rendered:
                 rendered_content.append(rendered)
         return rendered_content
@@ -132,49 +234,67 @@ class BaseWebsiteView(TemplateView):
         return None
 
     def get_content_type(self, content_object):
-        for key, model in self.CONTENT_TYPES.items():
-            if isinstance(content_object, model):
-                return key
-        return None       
+        for _class in type(content_object).__mro__:
+            if _class in self.CONTENT_TYPE_KEYS:
+                return self.CONTENT_TYPE_KEYS[_class]
+        return None
 
     def get_content_id(self, content_object):
-        for key, model in self.CONTENT_TYPES.items():
-            if isinstance(content_object, model):
-                return '{key}-{id}'.format(
-                    key=key,
-                    id = content_object.id
-                )
-        return None
-    
-    def get_content_from_id(self, content_id):
-        if len(content_id.split('-')) is not 2:
+        key = self.get_content_type(content_object)
+        if key is None:
             return None
-        content_type, content_id = content_id.split('-')
-        if content_type in self.CONTENT_TYPES:
+        return '{key}-{id}'.format(
+            key=key,
+            id = content_object.id
+        )
+
+    def parse_content_id(self, content_id):
+        content_type, _, object_id = content_id.rpartition('-')
+        if content_type not in self.CONTENT_TYPES or not object_id.isdigit():
+            return None, None
+        return content_type, int(object_id)
+
+    def get_related_item_keys(self, content_ids):
+        keys = []
+        for content_id in content_ids:
+            content_type, object_id = self.parse_content_id(content_id)
+            if content_type:
+                _content_type = ContentType.objects.get_for_model(self.CONTENT_TYPES[content_type])
+                keys.append((_content_type.id, object_id))
+        return keys
+
+    def get_contents_from_ids(self, content_ids):
+        ids_by_content_type = {}
+        for content_id in content_ids:
+            content_type, object_id = self.parse_content_id(content_id)
+            if content_type:
+                ids_by_content_type.setdefault(content_type, set()).add(object_id)
+        contents = {}
+        for content_type, object_ids in ids_by_content_type.items():
             _model = self.CONTENT_TYPES[content_type]
-            try:
-                return _model.objects.get(id=content_id)
-            except _model.DoesNotExist:
-                pass
-        return None
+            for object_id, content_object in _model.objects.in_bulk(object_ids).items():
+                contents['{key}-{id}'.format(key=content_type, id=object_id)] = content_object
+        return contents
+
+    def get_content_from_id(self, content_id):
+        return self.get_contents_from_ids([content_id]).get(content_id)
 
     def get_content_url(self, content_object):
         if isinstance(content_object, RelatedItemsList):
             return reverse('home')
-        for key, model in self.CONTENT_TYPES.items():
-            if isinstance(content_object, model):
-                if key == 'question':
-                    return reverse('question', kwargs={
-                        'question_id': content_object.id
-                    })
-                if key == 'resource':
-                    return reverse('resource-article', kwargs={
-                        'article_id': content_object.id
-                    })
-                if key == 'patient':
-                    return reverse('patient-story', kwargs={
-                        'patient_id': content_object.id
-                    })
+        key = self.get_content_type(content_object)
+        if key == 'question':
+            return reverse('question', kwargs={
+                'question_id': content_object.id
+            })
+        if key == 'resource':
+            return reverse('resource-article', kwargs={
+                'article_id': content_object.id
+            })
+        if key == 'patient':
+            return reverse('patient-story', kwargs={
+                'patient_id': content_object.id
+            })
         return None
 
     def render_content(self, content):
@@ -186,29 +306,56 @@ class BaseWebsiteView(TemplateView):
             return self.render_article(content)
         return None
 
+    def get_content_version(self):
+        if not hasattr(self, '_content_version'):
+            self._content_version = get_version('content')
+        return self._content_version
+
+    def get_fragment_cache_key(self, content_type, content_id):
+        return 'fragment-{content_type}-{content_id}-{version}'.format(
+            content_type = content_type,
+            content_id = content_id,
+            version = self.get_content_version()
+        )
+
+    def render_cached_fragment(self, content_object, template_name, context):
+        key = self.get_fragment_cache_key(
+            self.get_content_type(content_object),
+            content_object.id
+        )
+        rendered = cache.get(key)
+        if rendered is None:
+            rendered = render_to_string(template_name, context)
+            cache.set(key, rendered, self.fragment_cache_timeout)
+        return rendered
+
+    def render_contents(self, contents):
+        contents = [content for content in contents if content is not None]
+        keys = [self.get_fragment_cache_key(self.get_content_type(content), content.id) for content in contents]
+        cached = cache.get_many(keys)
+        load_contents([content for content, key in zip(contents, keys) if key not in cached])
+        return [cached[key] if key in cached else self.render_content(content) for content, key in zip(contents, keys)]
+
     def render_article(self, article):
-        return render_to_string('resource-article-partial.html', {
+        return self.render_cached_fragment(article, 'resource-article-partial.html', {
             'article': article
         })
 
     def render_question(self, question):
-        return render_to_string('question-partial.html', {
+        return self.render_cached_fragment(question, 'question-partial.html', {
             'question': question
         })
 
     def render_patient(self, patient):
-        return render_to_string('patient-story-partial.html', {
+        return self.render_cached_fragment(patient, 'patient-story-partial.html', {
             'patient': patient
         })
 
     def get_and_render_all_content(self):
-        contents = []
-        for article in Article.objects.filter(published=True, parent=None).all():
-            contents.append(self.render_article(article))
-        for question in FrequentlyAskedQuestion.objects.filter(published=True).all():
-            contents.append(self.render_question(question))
-        for patient in Patient.objects.filter(published=True).all():
-            contents.append(self.render_patient(patient))
+        contents = get_article_tree().get_top_level_articles()
+        contents += list(FrequentlyAskedQuestion.objects.filter(published=True).all())
+        contents += list(Patient.objects.filter(published=True).all())
+        contents = self.render_contents(contents)
         random.shuffle(contents)
         return contents
 
@@ -240,16 +387,24 @@ class HomePageView(BaseWebsiteView):
 
     template_name = 'home-page.html'
 
+    def get_page_cache_variant(self):
+        variant = super().get_page_cache_variant()
+        variant.append('features=%s' % (','.join(self.get_selected_features())))
+        return variant
+
+    def get_selected_features(self):
+        return [feature for feature, label in WebsiteConfigurationForm.FEATURE_FLAGS if feature in self.request.session and self.request.session[feature]]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         context['home_form'] = WebsiteConfigurationForm({
-            'features': [feature for feature, label in WebsiteConfigurationForm.FEATURE_FLAGS if feature in self.request.session and self.request.session[feature]]
+            'features': self.get_selected_features()
         })
 
         if context['show_content'] and context['took_survey']:
-            results_list, _ = RelatedItemsList.objects.get_or_create(name='marco')
-            context['contents'] = [self.render_content(item) for item in results_list.content_list]
+            results_list = self.find_related_list('marco')
+            context['contents'] = self.render_contents(results_list.content_list)
         return context
 
     def post(self, request):
@@ -291,79 +446,69 @@ class ContentListView(BaseWebsiteView):
         
 
     def get_tags_for_content_items(self, content_items):
-        tags = []
-        for item in content_items:
-            content_type = ContentType.objects.get_for_model(item)
-            tagged_content_query = TaggedContent.objects.filter(
-                content_type = content_type,
-                object_id = item.id
-            ).prefetch_related('tag')
-            for tagged_content in tagged_content_query.all():
-                if tagged_content.tag.id not in [tag.id for tag in tags]:
-                    tags.append(tagged_content.tag)
-        return tags
-
-    def filter_content_items(self, content_items):
-        tag_categories_by_id = {}
-        tags = self.get_tags_for_content_items(content_items)
+        return self.tag_index.get_tags_for_content_items(content_items)
+
+    def group_tags_by_category(self, tags):
+        tags_by_category_id = {}
         for tag in tags:
-            if tag.category:
-                if tag.category.id not in tag_categories_by_id:
-                    tag_categories_by_id[tag.category.id] = []
-                tag_categories_by_id[tag.category.id].append(tag)
-        categories = TagCategory.objects.filter(
-            id__in = tag_categories_by_id.keys(),
-            published = True
-        ).all()
-        for category in categories:
-            if category.slug in self.request.GET and category.id in tag_categories_by_id:
-                for _tag in tag_categories_by_id[category.id]:
-                    if _tag.slug == self.request.GET[category.slug]:
-                        tagged_items = TaggedContent.objects.filter(tag=_tag).all()
-                        tagged_item_ids = ['%s-%d' % (cont.content_type.model, cont.object_id) for cont in tagged_items]
-                        
-                        filtered_content_items = []
-                        for item in content_items:
-                            ct = ContentType.objects.get_for_model(item)
-                            item_id = '%s-%d' % (ct.model, item.id)
-                            if item_id in tagged_item_ids:
-                                filtered_content_items.append(item)
-                        content_items = filtered_content_items
-
-        return content_items
-        
+            if tag.category_id:
+                tags_by_category_id.setdefault(tag.category_id, []).append(tag)
+        categories = self.tag_index.get_published_categories(tags_by_category_id.keys())
+        return [(category, tags_by_category_id[category.id]) for category in categories]
+
+    def get_selected_tag_slugs(self):
+        selected_tag_slugs = {}
+        for key in self.request.GET:
+            selected_tag_slugs[key] = [value for value in self.request.GET.getlist(key) if value]
+        return selected_tag_slugs
+
+    def get_page_cache_parameters(self):
+        parameters = super().get_page_cache_parameters()
+        if self.sort_order:
+            parameters.append(('sort', self.sort_order))
+        for category_slug, tag_slugs in self.get_selected_tag_slugs().items():
+            for tag in self.tag_index.get_category_tags(category_slug):
+                if tag.slug in tag_slugs:
+                    parameters.append((category_slug, tag.slug))
+        return parameters
+
+    def get_url_without_parameter(self, name):
+        parameters = [(key, value) for key, value in sorted(set(self.get_page_cache_parameters())) if key != name]
+        if not parameters:
+            return self.request.path
+        return '%s?%s' % (self.request.path, urlencode(parameters))
+
+    def get_tag_facets(self, content_items):
+        tags = self.get_tags_for_content_items(content_items)
+        return TagFacets(
+            self.tag_index,
+            content_items,
+            self.group_tags_by_category(tags),
+            self.get_selected_tag_slugs()
+        )
+
+    def filter_content_items(self, content_items, facets):
+        return facets.filter(content_items)
 
-    def serialize_tags(self, tags):
+    def serialize_tags(self, facets):
         serialized_tags = []
-        tag_categories_by_id = {}
-        for tag in tags:
-            if tag.category:
-                if tag.category.id not in tag_categories_by_id:
-                    tag_categories_by_id[tag.category.id] = []
-                tag_categories_by_id[tag.category.id].append(tag)
-        categories = TagCategory.objects.filter(
-            id__in = tag_categories_by_id.keys(),
-            published = True
-        ).all()
-        for category in categories:
+        for category, category_tags in facets.category_tags:
             _tags = []
-            current_value = None
-            if category.slug in self.request.GET:
-                current_value = self.request.GET[category.slug]
-            if category.id in tag_categories_by_id:
-                for _tag in tag_categories_by_id[category.id]:
-                    _tags.append({
-                        'name': _tag.name,
-                        'slug': _tag.slug,
-                        'order': _tag.order,
-                        'selected': current_value == _tag.slug
-                    })
+            for _tag in category_tags:
+                _tags.append({
+                    'name': _tag.name,
+                    'slug': _tag.slug,
+                    'order': _tag.order,
+                    'count': facets.count(category, _tag),
+                    'selected': facets.is_selected(category, _tag)
+                })
             _tags.sort(key=lambda _tag: _tag['order'])
             _tags.append({
                 'name': 'Show all',
                 'slug': '',
-                'selected': True if not current_value else False
-            })            
+                'url': self.get_url_without_parameter(category.slug),
+                'selected': not any([_tag['selected'] for _tag in _tags])
+            })
             serialized_tags.append({
                 'name': category.name,
                 'slug': category.slug,
@@ -373,6 +518,7 @@ class ContentListView(BaseWebsiteView):
 
     def setup(self, request, *args, **kwargs):
         super().setup(request, *args, **kwargs)
+        self.tag_index = get_tag_index()
         self.setup_sort_options()
 
     def get_context_data(self, **kwargs):
@@ -384,6 +530,8 @@ class AllContentView(BaseWebsiteView):
 
     template_name = 'all-content-page.html'
 
+    cache_pages = False
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['contents'] = self.get_and_render_all_content()
@@ -457,54 +605,120 @@ class PatientStoryListView(ContentListView):
 
     current_navigation_item = 'patient-stories'
 
+    attribute_values = {
+        'age': ['age', 'age-at-transplant'],
+        'fev1before': ['fev1-at-transplant', 'fev1-at-transplant-evaluation'],
+        'current-fev1': ['current-fev1']
+    }
+
     def sort_patients(self, patients):
         sort_order = self.sort_order
         if sort_order == 'alphabetical':
-            patients.sort(key=lambda p: p.name)
-        if sort_order == 'age':
-            patients.sort(
-                key=lambda p: p.get_value(['age', 'age-at-transplant']) if p.get_value(['age', 'age-at-transplant']) else 0,
-                reverse=True
-            )
-        if sort_order == 'fev1before':
-            value_keys = ['fev1-at-transplant', 'fev1-at-transplant-evaluation']
-            patients.sort(
-                key=lambda p: p.get_value(value_keys) if p.get_value(value_keys) else 0,
-                reverse=True
-            )
-        if sort_order == 'current-fev1':
-            value_keys = ['current-fev1']
-            patients.sort(
-                key=lambda p: p.get_value(value_keys) if p.get_value(value_keys) else 0,
-                reverse=True
-            )
+            patients = patients.order_by('name', 'id')
+        if sort_order in self.attribute_values:
+            patients = patients.order_by_attribute_value(self.attribute_values[sort_order])
+        return patients
+
+    def get_range_value(self, name):
+        value = self.request.GET.get(name)
+        if value:
+            try:
+                return int(value)
+            except ValueError:
+                return None
+        return None
+
+    def get_range_filters(self):
+        range_filters = []
+        for key, name in self.sort_options:
+            if key in self.attribute_values:
+                range_filters.append({
+                    'key': key,
+                    'name': name,
+                    'min': self.get_range_value(key + '-min'),
+                    'max': self.get_range_value(key + '-max')
+                })
+        return range_filters
+
+    def get_page_cache_parameters(self):
+        parameters = super().get_page_cache_parameters()
+        for range_filter in self.get_range_filters():
+            for bound in ['min', 'max']:
+                if range_filter[bound] is not None:
+                    parameters.append(('%s-%s' % (range_filter['key'], bound), str(range_filter[bound])))
+        return parameters
+
+    def filter_patients_by_range(self, patients, range_filters):
+        for range_filter in range_filters:
+            if range_filter['min'] is not None or range_filter['max'] is not None:
+                patients = patients.filter(
+                    pk__in = Patient.objects.filter_attribute_range(
+                        self.attribute_values[range_filter['key']],
+                        minimum = range_filter['min'],
+                        maximum = range_filter['max']
+                    ).values('pk')
+                )
         return patients
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         patients = Patient.objects.filter(published=True).all()
-        
-        tags = self.get_tags_for_content_items(patients)
-        context['tags'] = self.serialize_tags(tags)
 
-        patients = list(patients)
+        range_filters = self.get_range_filters()
+        context['range_filters'] = range_filters
+        patients = self.filter_patients_by_range(patients, range_filters)
+
+        facets = self.get_tag_facets(patients)
+        context['tags'] = self.serialize_tags(facets)
+
         patients = self.sort_patients(patients)
-        patients = self.filter_content_items(patients)
+        patients = list(patients)
+        patients = self.filter_content_items(patients, facets)
 
-        context['content_list'] = [self.render_patient(p) for p in patients]
+        context['content_list'] = self.render_contents(patients)
         return context
 
 class ContentPageView(BaseWebsiteView):
 
     template_name = 'content-page.html'
+    page_placeholders = True
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.highlighted_contents = {}
+
+    def should_cache_page(self):
+        if self.study_session:
+            return False
+        return super().should_cache_page()
+
+    def fill_page_content(self, content):
+        content = super().fill_page_content(content)
+        if BACK_LINK_PLACEHOLDER not in content:
+            return content
+        back_link = self.request.META.get('HTTP_REFERER')
+        if back_link:
+            return content.replace(BACK_LINK_PLACEHOLDER, escape(back_link))
+        return BACK_LINK_ANCHOR.sub('', content)
+
+    def load_highlighted_contents(self, content_ids):
+        if not self.study_session:
+            self.highlighted_contents = {}
+            return
+        highlighted_contents = HighlightedContent.objects.filter(
+            session = self.study_session,
+            content_id__in = content_ids
+        ).all()
+        self.highlighted_contents = {hc.content_id: hc.content for hc in highlighted_contents}
 
-    def remove_links_from_content(self, content):
-        soup = BeautifulSoup(content, 'html.parser')
-        for link in soup.find_all('a'):
-            link_replacement = soup.new_tag('span')
-            link_replacement.string = link.text
-            link.replace_with(link_replacement)
-        return str(soup)
+    def render_highlightable_content(self, content_id, content_type, rendered):
+        if content_id in self.highlighted_contents:
+            rendered = self.highlighted_contents[content_id]
+        return '<article id="{content_id}" class="{content_type}" content-id="{content_id}">{content}</article>'.format(
+            content_id = content_id,
+            content_type = content_type,
+            content = rendered
+        )
 
     def render_nav_items(self, items):
         for item in items:
@@ -521,8 +735,7 @@ class ContentPageView(BaseWebsiteView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if 'HTTP_REFERER' in self.request.META:
-            context['back_link'] = self.request.META['HTTP_REFERER']
+        context['back_link'] = BACK_LINK_PLACEHOLDER
         return context
 
 class PatientStoryView(ContentPageView):
@@ -530,25 +743,16 @@ class PatientStoryView(ContentPageView):
     current_navigation_item = 'patient-stories'
 
     def render_patient_story(self, patient_story):
-        content = self.remove_links_from_content(patient_story.content)
+        content = patient_story.get_content_without_links()
         rendered = render_to_string('story-partial.html', {
             'id': patient_story.id,
             'title': patient_story.title,
             'content': content
         })
-        try:
-            highlighted_content = HighlightedContent.objects.get(
-                session = self.study_session,
-                content_id = 'patient-story-%d' % (patient_story.id)
-            )
-            rendered = highlighted_content.content
-        except HighlightedContent.DoesNotExist:
-            pass
-
-        return '<article id="{content_id}" class="{content_type}" content-id="{content_id}">{content}</article>'.format(
-            content_id = 'patient-story-%d' % (patient_story.id),
-            content_type = 'patient-story',
-            content = rendered
+        return self.render_highlightable_content(
+            'patient-story-%d' % (patient_story.id),
+            'patient-story',
+            rendered
         )
     
     def render_patient_attributes(self, patient):
@@ -561,7 +765,7 @@ class PatientStoryView(ContentPageView):
             '<h1 id="top">%s</h1>' % (patient.name),
             self.render_patient_attributes(patient)
         ]
-        
+        self.load_highlighted_contents(['patient-story-%d' % (story.id) for story in patient_stories])
         contents += [self.render_patient_story(story) for story in patient_stories]
         return contents  
 
@@ -592,17 +796,12 @@ class ResourceLibraryView(ContentListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        articles = Article.objects.filter(
-            parent=None,
-            published = True
-        ) \
-        .order_by('order') \
-        .all()
+        articles = get_article_tree().get_top_level_articles()
 
-        tags = self.get_tags_for_content_items(articles)
-        context['tags'] = self.serialize_tags(tags)
-        articles = self.filter_content_items(articles)
-        context['content_list'] = [self.render_content(a) for a in articles]
+        facets = self.get_tag_facets(articles)
+        context['tags'] = self.serialize_tags(facets)
+        articles = self.filter_content_items(articles, facets)
+        context['content_list'] = self.render_contents(articles)
         context['articles'] = articles
         return context
 
@@ -614,21 +813,16 @@ class ResourceArticleView(ContentPageView):
         rendered = render_to_string('resource-article.html', {
             'article': article
         })
-        try:
-            highlighted_content = HighlightedContent.objects.get(
-                session = self.study_session,
-                content_id = 'resource-%d' % (article.id)
-            )
-            rendered = highlighted_content.content
-        except HighlightedContent.DoesNotExist:
-            pass
-        return '<article id="{content_id}" class="{content_type}" content-id="{content_id}">{content}</article>'.format(
-            content_id = 'resource-%d' % (article.id),
-            content_type = 'resource-article',
-            content = rendered
+        return self.render_highlightable_content(
+            'resource-%d' % (article.id),
+            'resource-article',
+            rendered
         )
 
     def get_resource_article(self, article_id):
+        article = get_article_tree().get_article(int(article_id))
+        if article:
+            return article
         try:
             return Article.objects.get(id=article_id)
         except Article.DoesNotExist:
@@ -637,16 +831,17 @@ class ResourceArticleView(ContentPageView):
     def dispatch(self, request, *args, **kwargs):
         if 'article_id' in kwargs:
             self.article = self.get_resource_article(kwargs['article_id'])
-            if self.article.parent:
+            if self.article.parent_id:
                 url = reverse('resource-article', kwargs={
-                    'article_id': self.article.parent.id
+                    'article_id': self.article.parent_id
                 })
                 return HttpResponseRedirect(url + '#resource-%d' % (self.article.id))
         return super().dispatch(request, *args, **kwargs)
     
     def render_page_contents(self, article):
-        return [self.render_article_page(article)] + \
-            [self.render_article_page(_article) for _article in article.children]
+        articles = [article] + article.children
+        self.load_highlighted_contents(['resource-%d' % (_article.id) for _article in articles])
+        return [self.render_article_page(_article) for _article in articles]
 
     def get_context_data(self, article_id, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -672,22 +867,32 @@ class FrequentlyAskedQuestionListView(ContentListView):
     ]
     sort_order = 'default'
 
-    def sort_questions(self, questions):
+    def get_questions(self):
+        questions_in_categories = QuestionInCategory.objects.filter(
+            category__published = True
+        ) \
+        .select_related('question') \
+        .with_number_of_responses()
         if self.sort_order == 'responses':
-            questions.sort(key=lambda q: q.number_of_responses, reverse=True)
+            questions_in_categories = questions_in_categories.order_by('-number_of_responses', 'category__order', 'category_id', 'order', 'id')
+        else:
+            questions_in_categories = questions_in_categories.order_by('category__order', 'category_id', 'order', 'id')
+        questions = []
+        for question_in_category in questions_in_categories:
+            question = question_in_category.question
+            question._number_of_responses = question_in_category.number_of_responses
+            questions.append(question)
         return questions
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        questions = []
-        for category in FAQCategory.objects.filter(published=True).all():
-            questions += category.questions
+        questions = self.get_questions()
 
-        tags = self.get_tags_for_content_items(questions)
-        context['tags'] = self.serialize_tags(tags)
+        facets = self.get_tag_facets(questions)
+        context['tags'] = self.serialize_tags(facets)
         
-        questions = self.sort_questions(questions)
-        context['questions'] = self.filter_content_items(questions)
+        questions = load_questions(questions)
+        context['questions'] = self.filter_content_items(questions, facets)
         return context
 
 class FrequentlyAskedQuestionView(ContentPageView):
@@ -698,22 +903,15 @@ class FrequentlyAskedQuestionView(ContentPageView):
         rendered = render_to_string('faq-response.html',{
             'response': response
         })
-        try:
-            highlighted_content = HighlightedContent.objects.get(
-                session = self.study_session,
-                content_id = 'response-%d' % (response.id)
-            )
-            rendered = highlighted_content.content
-        except HighlightedContent.DoesNotExist:
-            pass
-        return '<article id="{content_id}" class="{content_type}" content-id="{content_id}">{content}</article>'.format(
-            content_id = 'response-%d' % (response.id),
-            content_type = 'faq-response',
-            content = rendered
+        return self.render_highlightable_content(
+            'response-%d' % (response.id),
+            'faq-response',
+            rendered
         )
 
     def render_page_contents(self, question):
         contents = ['<h1 id="top">%s</h1>' % (question.text)]
+        self.load_highlighted_contents(['response-%d' % (response.id) for response in question.responses])
         contents += [self.render_faq_response(response) for response in question.responses]
         return contents        
 
@@ -736,17 +934,24 @@ class RelatedContentView(BaseWebsiteView):
 
     template_name = 'add-related-content-page.html'
 
+    cache_pages = False
+
     def get_content(self, content_type, content_id):
         if content_id == 'marco':
-            items_list, _ = RelatedItemsList.objects.get_or_create(name='marco')
-            return items_list
-        for key, _model in self.CONTENT_TYPES.items():
-            if content_type == key:
-                try:
-                    return _model.objects.get(id=content_id)
-                except _model.DoesNotExist:
-                    raise Http404('Content not found')
-        raise Http404('Unknown content type')
+            return self.find_related_list('marco')
+        if content_type not in self.CONTENT_TYPES:
+            raise Http404('Unknown content type')
+        _model = self.CONTENT_TYPES[content_type]
+        try:
+            return _model.objects.get(id=content_id)
+        except _model.DoesNotExist:
+            raise Http404('Content not found')
+
+    def get_or_create_related_list(self, content):
+        related_list = self.get_related_list(content)
+        if related_list.pk is None:
+            related_list, _ = RelatedItemsList.objects.get_or_create(name=related_list.name)
+        return related_list
 
     def serialize_question(self, question):
         return {
@@ -766,39 +971,14 @@ class RelatedContentView(BaseWebsiteView):
                 'content_id': self.get_content_id(resource)
         }
 
-    def serialize_questions(self, questions):
-        serialized = []
-        for question in questions:
-            serialized.append(self.serialize_question(question))
-        return serialized
-
-    def serialize_patients(self, patients):
-        serialized = []
-        for patient in patients:
-            serialized.append(self.serialize_patient(patient))
-        return serialized
-
-    def serialize_resources(self, resources):
-        serialized = []
-        for resource in resources:
-            serialized.append(self.serialize_resource(resource))
-        return serialized
-    
     def serialize_content(self, content_object):
-        for key, model in self.CONTENT_TYPES.items():
-            if isinstance(content_object, model):
-                if key == 'question':
-                    return self.serialize_question(content_object)
-                if key == 'patient':
-                    return self.serialize_patient(content_object)
-                if key == 'resource':
-                    return self.serialize_resource(content_object)
-
-    def get_all_published_resources(self):
-        all_resources = []
-        for article in Article.objects.filter(published = True, parent = None).all():
-            all_resources += [article] + article.children
-        return all_resources
+        key = self.get_content_type(content_object)
+        if key == 'question':
+            return self.serialize_question(content_object)
+        if key == 'patient':
+            return self.serialize_patient(content_object)
+        if key == 'resource':
+            return self.serialize_resource(content_object)
 
     def get_context_data(self, content_type, content_id, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -806,53 +986,42 @@ class RelatedContentView(BaseWebsiteView):
         
         self.related_content = self.get_related_items(self.content_object)
         context['related_content'] = [self.get_content_id(rc.content_object) for rc in self.related_content]
-
-        all_questions = FrequentlyAskedQuestion.objects.filter(published=True).all()
-        all_patients = Patient.objects.filter(
-            published = True
-        ).all()
-        all_resources = self.get_all_published_resources()
-
-        context['content_types'] = [
-            {
-                'title': 'Questions',
-                'items': self.serialize_questions(all_questions)
-            },
-            {
-                'title': 'Patient Stories',
-                'items': self.serialize_patients(all_patients)
-            },
-            {
-                'title': 'Resource Articles',
-                'items': self.serialize_resources(all_resources)
-            }
-        ]
-
         return context
 
+    def get_existing_related_item_keys(self, content_ids):
+        ids_by_content_type = {}
+        for content_id in content_ids:
+            content_type, object_id = self.parse_content_id(content_id)
+            if content_type:
+                ids_by_content_type.setdefault(content_type, set()).add(object_id)
+        existing_content_ids = set()
+        for content_type, object_ids in ids_by_content_type.items():
+            existing_ids = self.CONTENT_TYPES[content_type].objects.filter(
+                id__in = object_ids
+            ).values_list('id', flat=True)
+            for object_id in existing_ids:
+                existing_content_ids.add('{key}-{id}'.format(key=content_type, id=object_id))
+        return self.get_related_item_keys([_id for _id in content_ids if _id in existing_content_ids])
+
     def post(self, request, content_type, content_id, **kwargs):
         content = self.get_content(content_type, content_id)
-        related_list = self.get_related_list(content)
-
-        related_items = RelatedItem.objects.filter(item_list=related_list).all()
-        existing_content_ids = [self.get_content_id(_item.content_object) for _item in related_items]
-        saved_content_object_ids = []
-        if 'related_content[]' in request.POST:
-            for item in request.POST.getlist('related_content[]'):
-                content_object = self.get_content_from_id(item)
-                if content_object:
-                    saved_content_object_ids.append(item)
-                if content_object and item not in existing_content_ids:
-                    RelatedItem.objects.create(
-                        item_list = related_list,
-                        content_object = content_object
-                    )
-        for existing_item in related_items:
-            if self.get_content_id(existing_item.content_object) not in saved_content_object_ids:
-                existing_item.delete()
-            
+        related_list = self.get_or_create_related_list(content)
+        submitted_ids = request.POST.getlist('related_content[]')
+        related_list.sync_items(self.get_existing_related_item_keys(submitted_ids))
         return HttpResponseRedirect(self.get_content_url(content))
 
+def get_content_catalog_etag(request, *args, **kwargs):
+    return get_version('content')
+
+@method_decorator(cache_control(no_cache=True), name='dispatch')
+@method_decorator(condition(etag_func=get_content_catalog_etag), name='dispatch')
+class ContentCatalogView(View):
+
+    def get(self, request):
+        return JsonResponse({
+            'content_types': get_content_catalog()
+        })
+
 class ReorderRelatedContent(RelatedContentView):
 
     template_name = 'reorder-related-content.html'
@@ -869,26 +1038,9 @@ class ReorderRelatedContent(RelatedContentView):
     def post(self, request, content_type, content_id, **kwargs):
         content = self.get_content(content_type, content_id)
         related_list = self.get_related_list(content)
-        related_items = RelatedItem.objects.filter(item_list=related_list).all()
-        related_by_id = {}
-        for related_item in related_items:
-            content_id = self.get_content_id(related_item.content_object)
-            related_by_id[content_id] = related_item
-        
-        ordered_content = request.POST.getlist('ordered_content[]')
-        new_item_list = []
-        for ordered_content_id in ordered_content:
-            if ordered_content_id in related_by_id:
-                new_item_list.append(related_by_id[ordered_content_id])
-
-        for related_item in related_items:
-            if related_item not in new_item_list:
-                related_item.delete()
-
-        for index, related_item in enumerate(new_item_list):
-            related_item.order = (index + 1) * 10
-            related_item.save()
-
+        if related_list.pk is not None:
+            ordered_content = request.POST.getlist('ordered_content[]')
+            related_list.reorder_items(self.get_related_item_keys(ordered_content))
         return HttpResponseRedirect(self.get_content_url(content))
 
 class AuthorDrivenView(View):
@@ -3,28 +3,98 @@ import Sortable from 'sortablejs';
 import {ContentHighlighter} from './content-highlighter.js'
 import {Highlight} from './content-highlighter.js'
 
+function createPopover(element, content) {
+    const _tippy = tippy(element, {
+        allowHTML: true,
+        appendTo: document.body,
+        content: content,
+        interactive: true,
+        trigger: 'mouseenter focus click',
+        followCursor: 'initial',
+        plugins: [followCursor],
+        onShow: (instance) => {
+            hideAll({exclude: instance});
+        }
+    });
+    element.addEventListener('click', (event) => {
+        event.preventDefault();
+        _tippy.show();
+    });
+}
+
 function registerPopovers() {
+    const resourceElements = [];
     document.querySelectorAll('[data-toggle="popover"]').forEach((element) => {
         let content = element.getAttribute('data-content');
         if (content) {
-            const _tippy = tippy(element, {
-                allowHTML: true,
-                appendTo: document.body,
-                content: content,
-                interactive: true,
-                trigger: 'mouseenter focus click',
-                followCursor: 'initial',
-                plugins: [followCursor],
-                onShow: (instance) => {
-                    hideAll({exclude: instance});
-                }
-            });
-            element.addEventListener('click', (event) => {
-                event.preventDefault();
-                _tippy.show();
-            });
+            createPopover(element, content);
+        } else if (element.getAttribute('data-resource-id')) {
+            resourceElements.push(element);
         }
     });
+    if (!resourceElements.length) return;
+
+    var request = new XMLHttpRequest();
+    request.responseType = 'json';
+    request.addEventListener("loadend", () => {
+        if (!request.response) return;
+        resourceElements.forEach((element) => {
+            let content = request.response[element.getAttribute('data-resource-id')];
+            if (content) {
+                createPopover(element, content);
+            }
+        });
+    });
+    request.open("GET", "/resources/popovers.json");
+    request.send();
+}
+
+function setupContentCatalog() {
+    const form = document.querySelector('form[data-content-catalog]');
+    if (!form) return;
+    const container = form.querySelector('.content-catalog-items');
+    const search = form.querySelector('.content-catalog-search');
+    const submit = form.querySelector('input[type=submit]');
+    const relatedContent = JSON.parse(document.getElementById('related-content').textContent);
+    const labels = [];
+
+    var request = new XMLHttpRequest();
+    request.responseType = 'json';
+    request.addEventListener("loadend", () => {
+        if (!request.response) return;
+        request.response.content_types.forEach((contentType) => {
+            const fieldset = document.createElement('fieldset');
+            const legend = document.createElement('legend');
+            legend.textContent = contentType.title;
+            fieldset.appendChild(legend);
+            contentType.items.forEach((item) => {
+                const label = document.createElement('label');
+                const input = document.createElement('input');
+                input.id = item.content_id;
+                input.type = 'checkbox';
+                input.name = 'related_content[]';
+                input.value = item.content_id;
+                input.checked = relatedContent.indexOf(item.content_id) !== -1;
+                label.htmlFor = item.content_id;
+                label.setAttribute('data-search', item.title.toLowerCase());
+                label.appendChild(input);
+                label.appendChild(document.createTextNode(' ' + item.title));
+                fieldset.appendChild(label);
+                labels.push(label);
+            });
+            container.appendChild(fieldset);
+        });
+        submit.disabled = false;
+    });
+    request.open("GET", form.getAttribute('data-content-catalog'));
+    request.send();
+
+    search.addEventListener('input', () => {
+        const query = search.value.trim().toLowerCase();
+        labels.forEach((label) => {
+            label.hidden = query !== '' && label.getAttribute('data-search').indexOf(query) === -1;
+        });
+    });
 }
 
 function setupActiveLinks() {
@@ -62,6 +132,7 @@ function makeSortableLists() {
 
 window.addEventListener('DOMContentLoaded', () => {
     registerPopovers();
+    setupContentCatalog();
     setupActiveLinks();
     makeSortableLists();
 